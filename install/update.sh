@@ -17,6 +17,7 @@ SCRIPT_DIR=$( cd -P "$( dirname "$SOURCE" )" >/dev/null 2>&1 && pwd )
 APPNAME="inkypi"
 INSTALL_PATH="/usr/local/$APPNAME"
 VENV_PATH="$INSTALL_PATH/venv_$APPNAME"
+SRC_PATH="$SCRIPT_DIR/../src"
 
 APT_REQUIREMENTS_FILE="$SCRIPT_DIR/debian-requirements.txt"
 PIP_REQUIREMENTS_FILE="$SCRIPT_DIR/requirements.txt"
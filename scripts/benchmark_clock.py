@@ -0,0 +1,54 @@
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from PIL import ImageColor
+
+# run from the repository root: python scripts/benchmark_clock.py [iterations]
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("SRC_DIR", SRC_DIR)
+sys.path.insert(0, SRC_DIR)
+
+from plugins.clock.clock import Clock, CLOCK_FACES, get_angle_field
+
+RESOLUTIONS = [
+    [400, 300],	# Inky wHAT
+    [640, 400], # Inky Impression 4"
+    [600, 448], # Inky Impression 5.7"
+    [800, 480], # Inky Impression 7.3"
+]
+
+DRAW_METHODS = {
+    "Gradient Clock": "draw_conic_clock",
+    "Digital Clock": "draw_digital_clock",
+    "Divided Clock": "draw_divided_clock",
+    "Word Clock": "draw_word_clock",
+}
+
+iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+clock = Clock({"id": "clock"})
+start_time = datetime(2025, 1, 1, 10, 8)
+
+print(f"{'face':<16}{'resolution':>12}{'first (ms)':>12}{'mean (ms)':>12}{'min (ms)':>12}")
+for face in CLOCK_FACES:
+    draw = getattr(clock, DRAW_METHODS[face["name"]])
+    primary_color = ImageColor.getcolor(face["primary_color"], "RGB")
+    secondary_color = ImageColor.getcolor(face["secondary_color"], "RGB")
+
+    for resolution in RESOLUTIONS:
+        dimensions = tuple(resolution)
+        # start cold, the first render fills the per resolution caches
+        get_angle_field.cache_clear()
+        for static_layer in (Clock.draw_digital_static, Clock.draw_divided_static, Clock.draw_word_static):
+            static_layer.cache_clear()
+
+        timings = []
+        for i in range(iterations + 1):
+            # advance a minute per render, the way the clock refreshes
+            current_time = start_time + timedelta(minutes=i)
+            start = time.perf_counter()
+            draw(dimensions, current_time, primary_color, secondary_color)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        first, rest = timings[0], timings[1:]
+        print(f"{face['name']:<16}{'x'.join(map(str, resolution)):>12}{first:>12.1f}{sum(rest) / len(rest):>12.1f}{min(rest):>12.1f}")
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, current_app, render_template, send_from_directory
+from flask import Blueprint, request, jsonify, current_app, render_template, send_from_directory, url_for
 from plugins.plugin_registry import get_plugin_instance
 from utils.app_utils import resolve_path, handle_request_files, parse_form
 from refresh_task import ManualRefresh, PlaylistRefresh
@@ -118,11 +118,11 @@ def display_plugin_instance():
         if not plugin_instance:
             return jsonify({"success": False, "message": f"Plugin instance '{plugin_instance_name}' not found"}), 400
 
-        refresh_task.manual_update(PlaylistRefresh(playlist, plugin_instance, force=True))
+        job = refresh_task.submit_update(PlaylistRefresh(playlist, plugin_instance, force=True))
     except Exception as e:
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
-    return jsonify({"success": True, "message": "Display updated"}), 200
+    return _job_accepted(job)
 
 @plugin_bp.route('/update_now', methods=['POST'])
 def update_now():
@@ -134,8 +134,26 @@ def update_now():
         plugin_settings.update(handle_request_files(request.files))
         plugin_id = plugin_settings.pop("plugin_id")
 
-        refresh_task.manual_update(ManualRefresh(plugin_id, plugin_settings))
+        job = refresh_task.submit_update(ManualRefresh(plugin_id, plugin_settings))
     except Exception as e:
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
-    return jsonify({"success": True, "message": "Display updated"}), 200
\ No newline at end of file
+    return _job_accepted(job)
+
+@plugin_bp.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    refresh_task = current_app.config['REFRESH_TASK']
+
+    job = refresh_task.get_job(job_id)
+    if not job:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+def _job_accepted(job):
+    """Returns the 202 response for a queued update, pointing the client at its job status endpoint."""
+    return jsonify({
+        "success": True,
+        "message": "Update queued",
+        "job_id": job.job_id,
+        "job_url": url_for("plugin.job_status", job_id=job.job_id)
+    }), 202
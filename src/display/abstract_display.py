@@ -1,3 +1,5 @@
+from utils.image_utils import DEFAULT_PALETTE
+
 class AbstractDisplay:
     """
     Abstract base class for all display devices.
@@ -43,3 +45,93 @@ class AbstractDisplay:
             NotImplementedError: If not implemented in a subclass.
         """
         raise NotImplementedError("Method 'display_image(...) must be provided in a subclass.")
+
+    def get_palette(self):
+        """
+        Returns the list of RGB colors the display is able to show.  Used to 
+        quantize frames before hashing so that only visible changes trigger a refresh.
+
+        Subclasses may override this, the default is the 7-color ACeP palette.
+
+        Returns:
+            list: List of (r, g, b) tuples.
+        """
+        return DEFAULT_PALETTE
+
+    def supports_partial_refresh(self):
+        """
+        Returns whether the display can update a region of the screen without
+        a full refresh.  Subclasses supporting it must implement `display_partial`.
+
+        Returns:
+            bool: False by default.
+        """
+        return False
+
+    def display_partial(self, image, bbox, image_settings=[]):
+        """
+        Updates only the region of the screen that changed.
+
+        Args:
+            image (PIL.Image): The full frame to be displayed.
+            bbox (tuple): Bounding box (left, upper, right, lower) of the changed region.
+            image_settings (list, optional): List of settings to modify how the image is displayed.
+
+        Raises:
+            NotImplementedError: If not implemented in a subclass.
+        """
+        raise NotImplementedError("Method 'display_partial(...) must be provided in a subclass.")
+
+    def get_buffer(self, image):
+        """
+        Converts a frame into the panel's native buffer format, so it can be prepared
+        ahead of time and later written with `display_buffer` without any image processing.
+
+        Subclasses supporting it must implement `display_buffer`.
+
+        Args:
+            image (PIL.Image): The frame at display resolution.
+
+        Returns:
+            The buffer, or None if the display doesn't support precomputed buffers (the default).
+        """
+        return None
+
+    def display_buffer(self, buffer):
+        """
+        Writes a buffer returned by `get_buffer` to the screen.
+
+        Args:
+            buffer: The panel buffer to be displayed.
+
+        Raises:
+            NotImplementedError: If not implemented in a subclass.
+        """
+        raise NotImplementedError("Method 'display_buffer(...) must be provided in a subclass.")
+
+    def display_partial_buffer(self, buffer, bbox):
+        """
+        Updates only the region of the screen that changed from a buffer returned by `get_buffer`.
+
+        Args:
+            buffer: The panel buffer of the full frame.
+            bbox (tuple): Bounding box (left, upper, right, lower) of the changed region, in panel coordinates.
+
+        Raises:
+            NotImplementedError: If not implemented in a subclass.
+        """
+        raise NotImplementedError("Method 'display_partial_buffer(...) must be provided in a subclass.")
+
+    def get_buffer_dirty_region(self, buffer, previous_buffer):
+        """
+        Returns the bounding box, in panel coordinates, of the pixels that differ between two
+        buffers returned by `get_buffer`, or None if it can't be determined.
+        """
+        return None
+
+    def clear(self):
+        """
+        Clears the screen to remove ghosting left behind by previous updates.
+        Displays that don't need this can leave it as a no-op.
+        """
+        pass
@@ -1,13 +1,27 @@
 import fnmatch
 import json
 import logging
+import sys
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from PIL import ImageChops
 
-from utils.image_utils import resize_image, change_orientation, apply_image_enhancement
+from utils.image_utils import process_frame, compute_image_hash
 from display.inky_display import InkyDisplay
 from display.waveshare_display import WaveshareDisplay
 
 logger = logging.getLogger(__name__)
 
+# Every Nth refresh is a full refresh that clears the screen first to remove ghosting
+DEFAULT_FULL_REFRESH_INTERVAL = 10
+
+# Partial refresh is only used when the changed region covers at most this fraction of the screen
+MAX_PARTIAL_REFRESH_AREA = 0.5
+
+# Memory held by precomputed frames, across all plugin instances. An 800x480 Inky frame takes about 400 KB
+MAX_PRECOMPUTED_BYTES = 16 * 1024 * 1024
+
 class DisplayManager:
 
     """Manages the display and rendering of images."""
@@ -42,7 +56,45 @@ class DisplayManager:
         else:
             raise ValueError(f"Unsupported display type: {display_type}")
 
-    def display_image(self, image, image_settings=[]):
+        # last frame sent to the display, used to compute the region that changed
+        self.last_frame = None
+        # panel buffer of the last precomputed frame sent to the display
+        self.last_buffer = None
+        self.refreshes_since_clear = 0
+
+        # frames prepared ahead of time by `precompute_frame`, least recently used are dropped first
+        self.precomputed_frames = OrderedDict()
+        self.precomputed_bytes = 0
+        self.precomputed_lock = threading.Lock()
+
+    def process_image(self, image, image_settings=[]):
+
+        """
+        Applies orientation, resizing and image enhancements to produce the frame
+        that would be sent to the display, in a single fused pass (see `process_frame`).
+
+        Args:
+            image (PIL.Image): The image generated by a plugin.
+            image_settings (list, optional): List of settings to modify image rendering.
+
+        Returns:
+            PIL.Image: The frame at display resolution.
+        """
+
+        return process_frame(
+            image,
+            self.device_config.get_resolution(),
+            orientation=self.device_config.get_config("orientation"),
+            inverted=bool(self.device_config.get_config("inverted_image")),
+            image_settings=image_settings,
+            enhancement_settings=self.device_config.get_config("image_settings") or {}
+        )
+
+    def get_palette(self):
+        """Returns the colors supported by the display."""
+        return self.display.get_palette()
+
+    def display_image(self, image, image_settings=[], frame=None):
         
         """
         Delegates image rendering to the appropriate display instance.
@@ -50,6 +102,8 @@ class DisplayManager:
         Args:
             image (PIL.Image): The image to be displayed.
             image_settings (list, optional): List of settings to modify image rendering.
+            frame (PIL.Image, optional): The already processed frame from `process_image`,
+                avoids processing the image twice.
 
         Raises:
             ValueError: If no valid display instance is found.
@@ -63,10 +117,164 @@ class DisplayManager:
         image.save(self.device_config.current_image_file)
 
         # Resize and adjust orientation
-        image = change_orientation(image, self.device_config.get_config("orientation"))
-        image = resize_image(image, self.device_config.get_resolution(), image_settings)
-        if self.device_config.get_config("inverted_image"): image = image.rotate(180)
-        image = apply_image_enhancement(image, self.device_config.get_config("image_settings"))
+        if frame is None:
+            frame = self.process_image(image, image_settings)
+
+        bbox = self.get_dirty_region(frame)
+        full_refresh_interval = self.device_config.get_config("full_refresh_interval", default=DEFAULT_FULL_REFRESH_INTERVAL)
+        self.refreshes_since_clear += 1
+
+        if full_refresh_interval and self.refreshes_since_clear >= full_refresh_interval:
+            # periodically clear the screen to remove ghosting from previous updates
+            self.display.clear()
+            self.refreshes_since_clear = 0
+            self.display.display_image(frame, image_settings)
+        elif bbox and self.display.supports_partial_refresh() and self.is_partial_region(bbox, frame.size):
+            self.display.display_partial(frame, bbox, image_settings)
+        else:
+            # Pass to the concrete instance to render to the device.
+            self.display.display_image(frame, image_settings)
+
+        self.last_frame = frame.copy()
+        self.last_buffer = None
+
+    def precompute_frame(self, image, image_settings=[]):
+
+        """
+        Does all the image work of displaying an image ahead of time: processing it into
+        a frame, hashing it, converting it into the panel buffer and encoding the PNG saved
+        as the current image.
+
+        Args:
+            image (PIL.Image): The image generated by a plugin.
+            image_settings (list, optional): List of settings to modify image rendering.
+
+        Returns:
+            PrecomputedFrame: The frame ready for `display_precomputed`, or None if the
+                display doesn't support precomputed buffers.
+        """
+
+        frame = self.process_image(image, image_settings)
+        buffer = self.display.get_buffer(frame)
+        if buffer is None:
+            return None
+
+        image_hash = compute_image_hash(frame, self.get_palette())
+        image_data = BytesIO()
+        image.save(image_data, format="PNG")
+        return PrecomputedFrame(image_hash, buffer, image_data.getvalue())
+
+    def add_precomputed_frame(self, key, precomputed):
+        """
+        Stores a precomputed frame under the key, dropping the least recently used frames
+        over MAX_PRECOMPUTED_BYTES.
+
+        Returns:
+            bool: True if there is room left for another frame of the same size.
+        """
+        with self.precomputed_lock:
+            self._remove_precomputed_frame(key)
+            self.precomputed_frames[key] = precomputed
+            self.precomputed_bytes += precomputed.size
+            while self.precomputed_bytes > MAX_PRECOMPUTED_BYTES:
+                _, dropped = self.precomputed_frames.popitem(last=False)
+                self.precomputed_bytes -= dropped.size
+            return self.precomputed_bytes + precomputed.size <= MAX_PRECOMPUTED_BYTES
+
+    def get_precomputed_frame(self, key):
+        """Returns the precomputed frame stored under the key, or None."""
+        with self.precomputed_lock:
+            precomputed = self.precomputed_frames.get(key)
+            if precomputed:
+                self.precomputed_frames.move_to_end(key)
+            return precomputed
+
+    def pop_precomputed_frame(self, key):
+        """Removes and returns the precomputed frame stored under the key, or None."""
+        with self.precomputed_lock:
+            return self._remove_precomputed_frame(key)
+
+    def _remove_precomputed_frame(self, key):
+        # called with the precomputed lock held
+        precomputed = self.precomputed_frames.pop(key, None)
+        if precomputed:
+            self.precomputed_bytes -= precomputed.size
+        return precomputed
+
+    def display_precomputed(self, precomputed):
+
+        """
+        Displays a frame prepared by `precompute_frame`. Only the stored PNG is written and
+        the panel buffer sent, no image processing happens here.
+
+        Args:
+            precomputed (PrecomputedFrame): The frame to be displayed.
+
+        Raises:
+            ValueError: If no valid display instance is found.
+        """
+
+        if not hasattr(self, "display"):
+            raise ValueError("No valid display instance initialized.")
+
+        logger.info(f"Saving image to {self.device_config.current_image_file}")
+        with open(self.device_config.current_image_file, "wb") as f:
+            f.write(precomputed.image_data)
+
+        bbox = None
+        if self.display.supports_partial_refresh():
+            bbox = self.display.get_buffer_dirty_region(precomputed.buffer, self.last_buffer)
+        full_refresh_interval = self.device_config.get_config("full_refresh_interval", default=DEFAULT_FULL_REFRESH_INTERVAL)
+        self.refreshes_since_clear += 1
+
+        if full_refresh_interval and self.refreshes_since_clear >= full_refresh_interval:
+            # periodically clear the screen to remove ghosting from previous updates
+            self.display.clear()
+            self.refreshes_since_clear = 0
+            self.display.display_buffer(precomputed.buffer)
+        elif bbox and self.is_partial_region(bbox, self.device_config.get_resolution()):
+            self.display.display_partial_buffer(precomputed.buffer, bbox)
+        else:
+            self.display.display_buffer(precomputed.buffer)
+
+        # the frame itself isn't kept, the next regular image is sent in full
+        self.last_frame = None
+        self.last_buffer = precomputed.buffer
+
+    def get_dirty_region(self, frame):
+        """Returns the bounding box of the pixels that differ from the last displayed frame, or None if unknown."""
+        if self.last_frame is None or self.last_frame.size != frame.size:
+            return None
+        return ImageChops.difference(self.last_frame.convert("RGB"), frame.convert("RGB")).getbbox()
+
+    @staticmethod
+    def is_partial_region(bbox, size):
+        """Checks whether the region is small enough to be updated with a partial refresh."""
+        left, upper, right, lower = bbox
+        width, height = size
+        return (right - left) * (lower - upper) <= width * height * MAX_PARTIAL_REFRESH_AREA
+
+class PrecomputedFrame:
+    """A frame prepared ahead of time, ready to be sent to the display.
+
+    Attributes:
+        image_hash (str): Hash of the palette-quantized frame, compared with the displayed one.
+        buffer: The frame converted into the panel's native buffer format.
+        image_data (bytes): The plugin image encoded as PNG, saved as the current image.
+        size (int): Approximate number of bytes held by the buffer and the PNG.
+    """
+
+    def __init__(self, image_hash, buffer, image_data):
+        self.image_hash = image_hash
+        self.buffer = buffer
+        self.image_data = image_data
+        self.size = PrecomputedFrame.get_buffer_size(buffer) + len(image_data)
 
-        # Pass to the concrete instance to render to the device.
-        self.display.display_image(image, image_settings)
\ No newline at end of file
+    @staticmethod
+    def get_buffer_size(buffer):
+        """Returns the bytes held by a panel buffer, a numpy array, a bytearray or list, or a tuple of those."""
+        if hasattr(buffer, "nbytes"):
+            return buffer.nbytes
+        if isinstance(buffer, tuple):
+            return sum(PrecomputedFrame.get_buffer_size(part) for part in buffer)
+        return sys.getsizeof(buffer)
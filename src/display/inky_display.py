@@ -1,10 +1,19 @@
 import logging
+import threading
 from inky.auto import auto
 from display.abstract_display import AbstractDisplay
+from utils.image_utils import DEFAULT_PALETTE
 
 
 logger = logging.getLogger(__name__)
 
+# Palettes of the fixed color Inky boards, keyed by the driver's `colour` attribute
+INKY_PALETTES = {
+    "black": [(0, 0, 0), (255, 255, 255)],
+    "red": [(0, 0, 0), (255, 255, 255), (255, 0, 0)],
+    "yellow": [(0, 0, 0), (255, 255, 255), (255, 255, 0)]
+}
+
 class InkyDisplay(AbstractDisplay):
 
     """
@@ -30,6 +39,9 @@ class InkyDisplay(AbstractDisplay):
         self.inky_display = auto()
         self.inky_display.set_border(self.inky_display.BLACK)
 
+        # the driver converts images into its own buffer, guard it against buffers prepared from other threads
+        self.lock = threading.Lock()
+
         # store display resolution in device config
         if not self.device_config.get_config("resolution"):
             self.device_config.update_value(
@@ -58,5 +70,38 @@ class InkyDisplay(AbstractDisplay):
             raise ValueError(f"No image provided.")
 
         # Display the image on the Inky display
-        self.inky_display.set_image(image)
-        self.inky_display.show()
\ No newline at end of file
+        with self.lock:
+            self.inky_display.set_image(image)
+            self.inky_display.show()
+
+    def get_buffer(self, image):
+        """
+        Converts the frame into the Inky driver's palette buffer.
+
+        Returns None for drivers that don't keep their pixels in a `buf` array. The driver's
+        buffer is restored afterwards, it still holds the pixels on the panel.
+        """
+        with self.lock:
+            if getattr(self.inky_display, "buf", None) is None:
+                return None
+            current_buffer = self.inky_display.buf.copy()
+            try:
+                self.inky_display.set_image(image)
+                return self.inky_display.buf.copy()
+            finally:
+                self.inky_display.buf = current_buffer
+
+    def display_buffer(self, buffer):
+        """Displays a buffer prepared by `get_buffer` on the Inky display."""
+        logger.info("Displaying buffer to Inky display.")
+        with self.lock:
+            self.inky_display.buf = buffer.copy()
+            self.inky_display.show()
+
+    def get_palette(self):
+        """
+        Returns the colors supported by the connected Inky board.
+
+        Multi color boards (e.g. Inky Impression) use the default palette.
+        """
+        return INKY_PALETTES.get(getattr(self.inky_display, "colour", None), DEFAULT_PALETTE)
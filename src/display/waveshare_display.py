@@ -1,6 +1,8 @@
 import inspect
 import importlib
 import logging
+import re
+import numpy as np
 
 from display.abstract_display import AbstractDisplay
 from PIL import Image
@@ -8,6 +10,21 @@ from plugins.plugin_registry import get_plugin_instance
 
 logger = logging.getLogger(__name__)
 
+# Colors declared as attributes by the drivers of single buffer color panels (e.g. epd7in3f, epd4in37g)
+WAVESHARE_DRIVER_COLORS = {
+    "RED": (255, 0, 0),
+    "YELLOW": (255, 255, 0),
+    "GREEN": (0, 255, 0),
+    "BLUE": (0, 0, 255),
+    "ORANGE": (255, 140, 0)
+}
+
+# Colors of the second buffer of bi-color panels, "b" models have a red layer and "c" models a yellow one
+BI_COLOR_MODEL_COLORS = {
+    "b": (255, 0, 0),
+    "c": (255, 255, 0)
+}
+
 class WaveshareDisplay(AbstractDisplay):
     """
     Handles Waveshare e-paper display dynamically based on device type.
@@ -61,6 +78,21 @@ class WaveshareDisplay(AbstractDisplay):
 
         self.bi_color_display = len(display_args_spec.args) > 2
 
+        # some drivers support partial refresh, either of the whole buffer (displayPartial(image))
+        # or of a window (display_Partial(image, Xstart, Ystart, Xend, Yend))
+        self.partial_display = None
+        self.partial_window = False
+        for method_name in ("display_Partial", "displayPartial"):
+            partial_display = getattr(self.epd_display, method_name, None)
+            if partial_display:
+                partial_args = inspect.getfullargspec(partial_display).args
+                self.partial_display = partial_display
+                self.partial_window = len(partial_args) >= 6
+                break
+        self.partial_init = getattr(self.epd_display, "init_part", None) or getattr(self.epd_display, "init_Partial", None)
+
+        self.palette = self._get_driver_palette(display_type)
+
         # update the resolution directly from the loaded device context
         if not self.device_config.get_config("resolution"):
             self.device_config.update_value(
@@ -89,24 +121,137 @@ class WaveshareDisplay(AbstractDisplay):
         if not image:
             raise ValueError(f"No image provided.")
 
+        self.display_buffer(self.get_buffer(image))
+
+    def get_palette(self):
+        """Returns black and white plus the colors of the panel, see `_get_driver_palette`."""
+        return self.palette
+
+    def _get_driver_palette(self, display_type):
+        """
+        Determines the colors of the loaded panel. Single buffer drivers of color panels declare
+        their colors as attributes, bi-color drivers take a second buffer whose color is given
+        by the model letter (e.g. epd7in5b_V2 is red, epd1in54c is yellow, epd2in13bc is either).
+        """
+        palette = [(0, 0, 0), (255, 255, 255)]
+        if not self.bi_color_display:
+            palette += [color for name, color in WAVESHARE_DRIVER_COLORS.items() if hasattr(self.epd_display, name)]
+            return palette
+
+        match = re.match(r"epd\d+in\d+([a-z]*)", display_type)
+        model_letters = match.group(1) if match else ""
+        colors = [color for letter, color in BI_COLOR_MODEL_COLORS.items() if letter in model_letters]
+        # unknown model letters, keep both colors so no visible change is missed
+        palette += colors or list(BI_COLOR_MODEL_COLORS.values())
+        return palette
+
+    def get_buffer(self, image):
+        """
+        Converts the frame into the driver's buffers, a tuple holding the black buffer
+        and, for bi-color displays, an empty color buffer.
+        """
+        if not self.bi_color_display:
+            return (self.epd_display.getbuffer(image),)
+        color_image = Image.new('1', image.size, 255)
+        return (self.epd_display.getbuffer(image), self.epd_display.getbuffer(color_image))
+
+    def display_buffer(self, buffer):
+        """Displays buffers prepared by `get_buffer` on the Waveshare display."""
+
         # Assume device was in sleep mode.
         self.epd_display.init()
 
-        # Clear residual pixels before updating the image.
-        self.epd_display.Clear()
-
         # Display the image on the WS display.
-        if not self.bi_color_display:
-            self.epd_display.display(self.epd_display.getbuffer(image))
-        else:
-            color_image = Image.new('1', image.size, 255)
-            self.epd_display.display(
-                self.epd_display.getbuffer(image),
-                self.epd_display.getbuffer(color_image)
-            )
+        self.epd_display.display(*buffer)
 
         # Put device into low power mode (EPD displays maintain image when powered off)
         logger.info("Putting Waveshare display into sleep mode for power saving.")
         self.epd_display.sleep()
 
-        
\ No newline at end of file
+    def supports_partial_refresh(self):
+        """Partial refresh is supported for single color drivers exposing a partial display method."""
+        return self.partial_display is not None and not self.bi_color_display
+
+    def display_partial(self, image, bbox, image_settings=[]):
+
+        """
+        Updates the changed region of the Waveshare display using the driver's partial refresh.
+
+        Args:
+            image (PIL.Image): The full frame to be displayed.
+            bbox (tuple): Bounding box (left, upper, right, lower) of the changed region.
+            image_settings (list, optional): Additional settings to modify image rendering.
+        """
+
+        self.display_partial_buffer(self.get_buffer(image), bbox)
+
+    def display_partial_buffer(self, buffer, bbox):
+
+        """
+        Updates the changed region of the Waveshare display from buffers prepared by `get_buffer`.
+
+        Windowed drivers receive the rows of the 1-bit buffer covering the bounding box, with the
+        horizontal bounds aligned to whole bytes as required by the controller.
+
+        Args:
+            buffer (tuple): The buffers of the full frame.
+            bbox (tuple): Bounding box (left, upper, right, lower) of the changed region.
+        """
+
+        logger.info(f"Partially refreshing Waveshare display. | bbox: {bbox}")
+        if self.partial_init:
+            self.partial_init()
+        else:
+            self.epd_display.init()
+
+        buffer = buffer[0]
+        if not self.partial_window:
+            self.partial_display(buffer)
+        else:
+            width, height = self.epd_display.width, self.epd_display.height
+            stride = len(buffer) // height
+            if stride * 8 == width:
+                x_start = bbox[0] // 8 * 8
+                x_end = min(width, -(-bbox[2] // 8) * 8)
+                y_start, y_end = bbox[1], bbox[3]
+                window = bytearray()
+                for y in range(y_start, y_end):
+                    row = y * stride
+                    window += buffer[row + x_start // 8: row + x_end // 8]
+                self.partial_display(window, x_start, y_start, x_end, y_end)
+            else:
+                # not a 1-bit buffer, refresh the whole screen through the partial waveform
+                self.partial_display(buffer, 0, 0, width, height)
+
+        logger.info("Putting Waveshare display into sleep mode for power saving.")
+        self.epd_display.sleep()
+
+    def get_buffer_dirty_region(self, buffer, previous_buffer):
+        """Compares the black buffers byte by byte, the horizontal bounds are rounded out to whole bytes.
+
+        Each byte of the 1-bit buffer holds 8 pixels, rows are padded to whole bytes when the width isn't a
+        multiple of 8.
+        """
+        if previous_buffer is None or len(previous_buffer[0]) != len(buffer[0]):
+            return None
+
+        width, height = self.epd_display.width, self.epd_display.height
+        current = np.frombuffer(bytes(buffer[0]), dtype=np.uint8)
+        previous = np.frombuffer(bytes(previous_buffer[0]), dtype=np.uint8)
+        if current.size % height:
+            return None
+
+        changed = (current != previous).reshape(height, -1)
+        rows = np.flatnonzero(changed.any(axis=1))
+        if not rows.size:
+            return None
+        columns = np.flatnonzero(changed.any(axis=0))
+
+        return (int(columns[0]) * 8, int(rows[0]),
+                min(width, (int(columns[-1]) + 1) * 8), int(rows[-1]) + 1)
+
+    def clear(self):
+        """Clears residual pixels from the Waveshare display."""
+        logger.info("Clearing Waveshare display.")
+        self.epd_display.init()
+        self.epd_display.Clear()
@@ -10,7 +10,7 @@ class RefreshInfo:
 
     Attributes:
         refresh_time (str): ISO-formatted time string of the refresh.
-        image_hash (int): SHA-256 hash of the image.
+        image_hash (str): SHA-256 hash of the displayed frame, quantized to the display palette.
         refresh_type (str): Refresh type ['Manual Update', 'Playlist'].
         plugin_id (str): Plugin id of the refresh.
         playlist (str): Playlist name if refresh_type is 'Playlist'.
@@ -226,6 +226,14 @@ class Playlist:
         
         return self.plugins[self.current_plugin_index]
 
+    def peek_next_plugin(self):
+        """Returns the plugin instance that `get_next_plugin` would return, without updating the current_plugin_index."""
+        if not self.plugins:
+            return None
+        if self.current_plugin_index is None:
+            return self.plugins[0]
+        return self.plugins[(self.current_plugin_index + 1) % len(self.plugins)]
+
     def get_priority(self):
         """Determine priority of a playlist, based on the time range"""
         return self.get_time_range_minutes()
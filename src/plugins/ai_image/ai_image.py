@@ -1,8 +1,6 @@
 from plugins.base_plugin.base_plugin import BasePlugin
 from openai import OpenAI
-from PIL import Image
-from io import BytesIO
-import requests
+from utils.image_utils import download_image
 import logging
 
 logger = logging.getLogger(__name__)
@@ -38,6 +36,10 @@ class AIImage(BasePlugin):
             image_quality = DEFAULT_IMAGE_QUALITY
         randomize_prompt = settings.get('randomizePrompt') == 'true'
 
+        dimensions = device_config.get_resolution()
+        if device_config.get_config("orientation") == "vertical":
+            dimensions = dimensions[::-1]
+
         image = None
         try:
             ai_client = OpenAI(api_key = api_key)
@@ -49,7 +51,8 @@ class AIImage(BasePlugin):
                 text_prompt,
                 model=image_model,
                 quality=image_quality,
-                orientation=device_config.get_config("orientation")
+                orientation=device_config.get_config("orientation"),
+                dimensions=dimensions
             )
         except Exception as e:
             logger.error(f"Failed to make Open AI request: {str(e)}")
@@ -57,7 +60,7 @@ class AIImage(BasePlugin):
         return image
 
     @staticmethod
-    def fetch_image(ai_client, prompt, model="dalle-e-3", quality="standard", orientation="horizontal"):
+    def fetch_image(ai_client, prompt, model="dalle-e-3", quality="standard", orientation="horizontal", dimensions=None):
         logger.info(f"Generating image for prompt: {prompt}, model: {model}, quality: {quality}")
         prompt += (
             ". The image should fully occupy the entire canvas without any frames, "
@@ -79,8 +82,7 @@ class AIImage(BasePlugin):
 
         response = ai_client.images.generate(**args)
         image_url = response.data[0].url
-        response = requests.get(image_url)
-        img = Image.open(BytesIO(response.content))
+        img = download_image(image_url, dimensions)
 
         return img
 
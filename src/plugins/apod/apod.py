@@ -6,9 +6,8 @@ For the API key, set `NASA_SECRET={API_KEY}` in your .env file.
 """
 
 from plugins.base_plugin.base_plugin import BasePlugin
-from PIL import Image
-from io import BytesIO
-import requests
+from utils.http_client import http_client
+from utils.image_utils import download_image
 import logging
 from random import randint
 from datetime import datetime, timedelta
@@ -44,7 +43,7 @@ class Apod(BasePlugin):
         elif settings.get("customDate"):
             params["date"] = settings["customDate"]
 
-        response = requests.get("https://api.nasa.gov/planetary/apod", params=params)
+        response = http_client.get("https://api.nasa.gov/planetary/apod", params=params)
 
         if response.status_code != 200:
             logger.error(f"NASA API error: {response.text}")
@@ -55,13 +54,28 @@ class Apod(BasePlugin):
         if data.get("media_type") != "image":
             raise RuntimeError("APOD is not an image today.")
 
-        image_url = data.get("hdurl") or data.get("url")
+        dimensions = device_config.get_resolution()
+        if device_config.get_config("orientation") == "vertical":
+            dimensions = dimensions[::-1]
 
-        try:
-            img_data = requests.get(image_url)
-            image = Image.open(BytesIO(img_data.content))
-        except Exception as e:
-            logger.error(f"Failed to load APOD image: {str(e)}")
+        # the standard image is usually large enough for the display, the HD image is only downloaded if it isn't
+        image_urls = [url for url in (data.get("url"), data.get("hdurl")) if url]
+        if not image_urls:
+            raise RuntimeError("APOD response has no image URL.")
+
+        image = None
+        for image_url in dict.fromkeys(image_urls):
+            try:
+                image = download_image(image_url, dimensions)
+            except Exception as e:
+                logger.error(f"Failed to load APOD image from {image_url}: {str(e)}")
+                continue
+
+            if image.width >= dimensions[0] and image.height >= dimensions[1]:
+                break
+            logger.info(f"APOD image smaller than the display, trying the next size. | url: {image_url} | size: {image.size}")
+
+        if image is None:
             raise RuntimeError("Failed to load APOD image.")
 
         return image
\ No newline at end of file
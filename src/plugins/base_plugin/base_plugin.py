@@ -1,7 +1,8 @@
 import logging
 import os
-from utils.app_utils import resolve_path, get_fonts
+from utils.app_utils import resolve_path, get_fonts, get_vendor_scripts
 from utils.image_utils import take_screenshot_html
+from utils.render_cache import render_cache
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from pathlib import Path
 import asyncio
@@ -49,6 +50,19 @@ class BasePlugin:
     def generate_image(self, settings, device_config):
         raise NotImplementedError("generate_image must be implemented by subclasses")
 
+    def get_frame_key(self, settings, device_config, dt):
+        """Returns a key for the image the plugin would generate at dt, or None if it can't be known ahead of time.
+
+        Plugins whose image only depends on the time (e.g. a clock) return a key such as the date and minute, so
+        upcoming frames can be precomputed with `generate_image_at` while the device is idle. Precomputed frames are
+        rendered at the start of their minute and shown for any time with the same key, so the image must be the
+        same for every time sharing a key.
+        """
+        return None
+
+    def generate_image_at(self, settings, device_config, dt):
+        raise NotImplementedError("generate_image_at must be implemented by plugins returning a frame key")
+
     def get_plugin_id(self):
         return self.config.get("id")
 
@@ -68,7 +82,13 @@ class BasePlugin:
         template_params['frame_styles'] = FRAME_STYLES
         return template_params
 
-    def render_image(self, dimensions, html_file, css_file=None, template_params={}):
+    def render_image(self, dimensions, html_file, css_file=None, template_params={}, block_network=False):
+        """Renders the html template to an image with the headless browser.
+
+        Templates reference bundled libraries through `vendor_scripts`, rendering fails with a RuntimeError if a
+        library the template uses is missing. If block_network is set, the browser isn't allowed any network
+        requests so the render can't stall on a remote asset.
+        """
         # load the base plugin and current plugin css files
         css_files = [os.path.join(BASE_PLUGIN_RENDER_DIR, "plugin.css")]
         if css_file:
@@ -79,9 +99,21 @@ class BasePlugin:
         template_params["width"] = dimensions[0]
         template_params["height"] = dimensions[1]
         template_params["font_faces"] = get_fonts()
+        template_params["vendor_scripts"] = get_vendor_scripts()
 
         # load and render the given html template
         template = self.env.get_template(html_file)
         rendered_html = template.render(template_params)
 
-        return take_screenshot_html(rendered_html, dimensions)
+        # identical inputs produce an identical screenshot, so skip the browser entirely on a cache hit
+        template_source = self.env.loader.get_source(self.env, html_file)[0]
+        css_sources = [Path(css).read_bytes() if os.path.isfile(css) else b"" for css in css_files]
+        cache_key = render_cache.compute_key(template_source, *css_sources, tuple(dimensions), rendered_html)
+        image = render_cache.get(cache_key)
+        if image:
+            return image
+
+        image = take_screenshot_html(rendered_html, dimensions, block_network=block_network)
+        if image:
+            render_cache.put(cache_key, image)
+        return image
@@ -6,14 +6,30 @@ from PIL import Image, ImageColor, ImageDraw, ImageFont
 import icalendar
 import recurring_ical_events
 from io import BytesIO
+import hashlib
 import logging
-import requests
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from utils.http_client import http_client
 from datetime import datetime, timedelta
 import pytz
 
 logger = logging.getLogger(__name__)
 
+# Number of expanded date ranges kept per calendar, one per view showing the feed
+MAX_CACHED_WINDOWS = 4
+
+MAX_FETCH_WORKERS = 4
+FEED_TIMEOUT_SECONDS = 20
+
 class Calendar(BasePlugin):
+    def __init__(self, config, **dependencies):
+        super().__init__(config, **dependencies)
+        # calendar url -> CachedCalendar of its last fetched content
+        self.calendar_cache = {}
+        self.calendar_cache_lock = threading.Lock()
+
     def generate_settings_template(self):
         template_params = super().generate_settings_template()
         template_params['style_settings'] = True
@@ -63,7 +79,7 @@ class Calendar(BasePlugin):
             "font_scale": FONT_SIZES.get(settings.get("fontSize", "normal"))
         }
 
-        image = self.render_image(dimensions, "calendar.html", "calendar.css", template_params)
+        image = self.render_image(dimensions, "calendar.html", "calendar.css", template_params, block_network=True)
 
         if not image:
             raise RuntimeError("Failed to take screenshot, please check logs.")
@@ -72,22 +88,24 @@ class Calendar(BasePlugin):
     def fetch_ics_events(self, calendar_urls, colors, tz, start_range, end_range):
         parsed_events = []
 
+        calendars = self.fetch_calendars(calendar_urls)
         for calendar_url, color in zip(calendar_urls, colors):
-            cal = self.fetch_calendar(calendar_url)
-            events = recurring_ical_events.of(cal).between(start_range, end_range)
+            cached_calendar = calendars.get(calendar_url)
+            if not cached_calendar:
+                continue
+            events = cached_calendar.get_events(tz, start_range, end_range, self.parse_data_points)
             contrast_color = self.get_contrast_color(color)
 
             for event in events:
-                start, end, all_day = self.parse_data_points(event, tz)
                 parsed_event = {
-                    "title": str(event.get("summary")),
-                    "start": start,
+                    "title": event["title"],
+                    "start": event["start"],
                     "backgroundColor": color,
                     "textColor": contrast_color,
-                    "allDay": all_day
+                    "allDay": event["allDay"]
                 }
-                if end:
-                    parsed_event['end'] = end
+                if event["end"]:
+                    parsed_event['end'] = event["end"]
 
                 parsed_events.append(parsed_event)
 
@@ -130,11 +148,57 @@ class Calendar(BasePlugin):
             end = (dtstart + duration).isoformat()
         return start, end, all_day
 
-    def fetch_calendar(self, calendar_url):
+    def fetch_calendars(self, calendar_urls):
+        """Fetches the feeds concurrently and returns a dict of calendar url to CachedCalendar.
+
+        A feed that fails or doesn't answer within FEED_TIMEOUT_SECONDS is rendered from its last cached copy,
+        or left out if there is none. Raises a RuntimeError only if no feed is available at all.
+        """
+        unique_urls = list(dict.fromkeys(calendar_urls))
+        executor = ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(unique_urls)))
+        futures = {executor.submit(self.fetch_calendar, url, FEED_TIMEOUT_SECONDS): url for url in unique_urls}
+        # read timeouts apply per socket read, bound the total wait as well
+        done, _ = wait(futures, timeout=FEED_TIMEOUT_SECONDS + 5)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        calendars = {}
+        errors = []
+        for future, url in futures.items():
+            try:
+                if future not in done:
+                    raise TimeoutError(f"No response within {FEED_TIMEOUT_SECONDS} seconds")
+                calendars[url] = future.result()
+            except Exception as e:
+                errors.append(str(e))
+                with self.calendar_cache_lock:
+                    cached_calendar = self.calendar_cache.get(url)
+                if cached_calendar:
+                    logger.warning(f"Failed to fetch calendar, using cached copy. | url: {url} | error: {e}")
+                    calendars[url] = cached_calendar
+                else:
+                    logger.warning(f"Failed to fetch calendar, skipping it. | url: {url} | error: {e}")
+
+        if not calendars:
+            raise RuntimeError(f"Failed to fetch calendars: {'; '.join(errors)}")
+        return calendars
+
+    def fetch_calendar(self, calendar_url, timeout=None):
+        """Fetches the feed and returns its CachedCalendar, the feed is only parsed again if its content changed."""
         try:
-            response = requests.get(calendar_url)
+            response = http_client.get(calendar_url, conditional=True, timeout=timeout)
             response.raise_for_status()
-            return icalendar.Calendar.from_ical(response.text)
+
+            content_hash = hashlib.sha256(response.content).hexdigest()
+            with self.calendar_cache_lock:
+                cached_calendar = self.calendar_cache.get(calendar_url)
+            if cached_calendar and cached_calendar.content_hash == content_hash:
+                logger.info(f"Calendar unchanged, using parsed copy. | url: {calendar_url}")
+                return cached_calendar
+
+            cached_calendar = CachedCalendar(content_hash, icalendar.Calendar.from_ical(response.content))
+            with self.calendar_cache_lock:
+                self.calendar_cache[calendar_url] = cached_calendar
+            return cached_calendar
         except Exception as e:
             raise RuntimeError(f"Failed to fetch iCalendar url: {str(e)}")
 
@@ -147,4 +211,46 @@ class Calendar(BasePlugin):
         # YIQ formula to estimate brightness
         yiq = (r * 299 + g * 587 + b * 114) / 1000
 
-        return '#000000' if yiq >= 150 else '#ffffff'
\ No newline at end of file
+        return '#000000' if yiq >= 150 else '#ffffff'
+
+class CachedCalendar:
+    """A parsed iCalendar feed along with its events expanded for recently requested date ranges.
+
+    Attributes:
+        content_hash (str): SHA-256 of the feed content the calendar was parsed from.
+        calendar (icalendar.Calendar): The parsed calendar.
+        windows (OrderedDict): (start, end, timezone) -> list of expanded events, most recently used last.
+    """
+
+    def __init__(self, content_hash, calendar):
+        self.content_hash = content_hash
+        self.calendar = calendar
+        self.windows = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_events(self, tz, start_range, end_range, parse_data_points):
+        """Returns the events between start_range and end_range as dicts with title, start, end and allDay.
+
+        Recurrences are only expanded the first time a range is requested for this content.
+        """
+        window = (start_range.isoformat(), end_range.isoformat(), str(tz))
+        with self.lock:
+            events = self.windows.get(window)
+            if events is not None:
+                self.windows.move_to_end(window)
+                return events
+
+            events = []
+            for event in recurring_ical_events.of(self.calendar).between(start_range, end_range):
+                start, end, all_day = parse_data_points(event, tz)
+                events.append({
+                    "title": str(event.get("summary")),
+                    "start": start,
+                    "end": end,
+                    "allDay": all_day
+                })
+
+            self.windows[window] = events
+            while len(self.windows) > MAX_CACHED_WINDOWS:
+                self.windows.popitem(last=False)
+            return events
@@ -7,6 +7,7 @@ import logging
 import numpy as np
 import math
 from datetime import datetime
+from functools import lru_cache
 import pytz
 
 logger = logging.getLogger(__name__)
@@ -41,6 +42,32 @@ CLOCK_FACES = [
 DEFAULT_TIMEZONE = "US/Eastern"
 DEFAULT_CLOCK_FACE = "Gradient Clock"
 
+# static layers kept per clock face, enough for both orientations of a display
+STATIC_LAYER_CACHE_SIZE = 2
+
+WORD_CLOCK_GRID = [
+    ['I','T','L','I','S','A','S','A','M','P','M'],
+    ['A','C','Q','U','A','R','T','E','R','D','C'],
+    ['T','W','E','N','T','Y','F','I','V','E','X'],
+    ['H','A','L','F','S','T','E','N','F','T','O'],
+    ['P','A','S','T','E','R','U','N','I','N','E'],
+    ['O','N','E','S','I','X','T','H','R','E','E'],
+    ['F','O','U','R','F','I','V','E','T','W','O'],
+    ['E','I','G','H','T','E','L','E','V','E','N'],
+    ['S','E','V','E','N','T','W','E','L','V','E'],
+    ['T','E','N','S','E','O','C','L','O','C','K'],
+]
+
+@lru_cache(maxsize=4)
+def get_angle_field(width, height):
+    """Returns the angle of every pixel around the image center, computed once per resolution."""
+    x, y = np.ogrid[:height, :width]
+    cx, cy = height/2, width/2
+    field = np.arctan2(x-cx, y-cy)
+    # shared between renders, guard against accidental in place edits
+    field.flags.writeable = False
+    return field
+
 class Clock(BasePlugin):
     def generate_settings_template(self):
         template_params = super().generate_settings_template()
@@ -48,6 +75,15 @@ class Clock(BasePlugin):
         return template_params
 
     def generate_image(self, settings, device_config):
+        return self.generate_image_at(settings, device_config, datetime.now(pytz.utc))
+
+    def get_frame_key(self, settings, device_config, dt):
+        """Clock frames change once a minute and don't show seconds, so the minute identifies the frame when precomputing is enabled."""
+        if settings.get('precomputeFrames') != "true":
+            return None
+        return dt.astimezone(Clock.get_timezone(device_config)).strftime("%Y-%m-%d %H:%M")
+
+    def generate_image_at(self, settings, device_config, dt):
         clock_face = settings.get('selectedClockFace')
         primary_color = ImageColor.getcolor(settings.get('primaryColor') or (255,255,255), "RGB")
         secondary_color = ImageColor.getcolor(settings.get('secondaryColor') or (0,0,0), "RGB")
@@ -58,9 +94,7 @@ class Clock(BasePlugin):
         if device_config.get_config("orientation") == "vertical":
             dimensions = dimensions[::-1]
 
-        timezone_name = device_config.get_config("timezone") or DEFAULT_TIMEZONE
-        tz = pytz.timezone(timezone_name)
-        current_time = datetime.now(tz)
+        current_time = dt.astimezone(Clock.get_timezone(device_config))
 
         img = None
         try:
@@ -81,36 +115,46 @@ class Clock(BasePlugin):
         w,h = dimensions
         time_str = Clock.format_time(time.hour, time.minute, zero_pad = True)
 
-        image = Image.new("RGBA", dimensions, secondary_color+(255,))
-        text = Image.new("RGBA", dimensions, (0, 0, 0, 0))
+        image, ghost = Clock.draw_digital_static(tuple(dimensions), primary_color, secondary_color)
+        text = ghost.copy()
 
-        font_size = w * 0.36
-        fnt = get_font("DS-Digital", font_size)
+        fnt = get_font("DS-Digital", w * 0.36)
         text_draw = ImageDraw.Draw(text)
 
         # time text
-        text_draw.text((w/2, h/2), "00:00", font=fnt, anchor="mm", fill=primary_color +(30,))
         text_draw.text((w/2, h/2), time_str, font=fnt, anchor="mm", fill=primary_color +(255,))
 
         combined = Image.alpha_composite(image, text)    
 
         return combined
+
+    @staticmethod
+    @lru_cache(maxsize=STATIC_LAYER_CACHE_SIZE)
+    def draw_digital_static(dimensions, primary_color, secondary_color):
+        """
+        Draw the parts of the digital clock that don't change from minute to minute, cached per resolution and colors.
+
+        :return: A tuple (background, text) of RGBA images, the text layer holds the ghosted "00:00".
+                Both are shared between renders and must be copied before drawing on them.
+        """
+        w,h = dimensions
+        image = Image.new("RGBA", dimensions, secondary_color+(255,))
+        text = Image.new("RGBA", dimensions, (0, 0, 0, 0))
+
+        font_size = w * 0.36
+        fnt = get_font("DS-Digital", font_size)
+        text_draw = ImageDraw.Draw(text)
+        text_draw.text((w/2, h/2), "00:00", font=fnt, anchor="mm", fill=primary_color +(30,))
+
+        return image, text
         
     def draw_conic_clock(self, dimensions, time, primary_color=(219, 50, 70, 255), secondary_color=(0, 0, 0, 255) ):
         width, height = dimensions
         hour_angle, minute_angle = Clock.calculate_clock_angles(time)
 
-        # Draw the hour hand gradient
-        image_hour = Clock.draw_gradient_image(
+        final_image = Clock.draw_gradient_image(
             width, height, hour_angle, minute_angle, secondary_color, primary_color
         )
-        # Draw the minute hand gradient
-        image_minute = Clock.draw_gradient_image(
-            width, height, minute_angle, hour_angle, secondary_color, primary_color
-        )
-
-        # Combine the images using alpha blending
-        final_image = Image.alpha_composite(image_hour, image_minute)
 
         dim = min(width, height)
         minute_length = dim * 0.35
@@ -129,6 +173,29 @@ class Clock(BasePlugin):
         return final_image
 
     def draw_divided_clock(self, dimensions, time, primary_color=(32,183,174), secondary_color=(255,255,255)):
+        w,h = dimensions
+        # hands are drawn inside the opaque clock face, so they can go straight onto the composited face
+        combined = Clock.draw_divided_static(tuple(dimensions), primary_color, secondary_color).copy()
+
+        # used to calculate percentages of sizes
+        dim = min(w,h)
+
+        hour_angle, minute_angle = Clock.calculate_clock_angles(time)
+        hand_width = max(int(dim * 0.009), 1)
+        Clock.draw_clock_hand(combined, int(dim*0.3), minute_angle, secondary_color, hand_width=hand_width, border_color=secondary_color, round_corners=False)
+        Clock.draw_clock_hand(combined, int(dim*0.2), hour_angle, secondary_color, hand_width=hand_width, border_color=secondary_color, round_corners=False)
+
+        Clock.drew_clock_center(combined, max(int(dim*0.014), 1), primary_color, secondary_color, width=max(int(dim* 0.007), 1))
+
+        return combined
+
+    @staticmethod
+    @lru_cache(maxsize=STATIC_LAYER_CACHE_SIZE)
+    def draw_divided_static(dimensions, primary_color, secondary_color):
+        """
+        Draw the divided background, clock face and hour marks, cached per resolution and colors.
+        The returned image is shared between renders and must be copied before drawing on it.
+        """
         w,h = dimensions
         bg = Image.new("RGBA", dimensions, primary_color+(255,))
         bg_draw = ImageDraw.Draw(bg)
@@ -151,20 +218,40 @@ class Clock(BasePlugin):
         # clock outline
         image_draw.circle((w/2,h/2), face_size, fill=primary_color, outline=secondary_color, width=int(dim * 0.03125))
         
-        Clock.draw_hour_marks(image_draw._image, face_size - int(w*0.04375))
+        Clock.draw_hour_marks(canvas, face_size - int(w*0.04375))
 
-        hour_angle, minute_angle = Clock.calculate_clock_angles(time)
-        hand_width = max(int(dim * 0.009), 1)
-        Clock.draw_clock_hand(image_draw._image, int(dim*0.3), minute_angle, secondary_color, hand_width=hand_width, border_color=secondary_color, round_corners=False)
-        Clock.draw_clock_hand(image_draw._image, int(dim*0.2), hour_angle, secondary_color, hand_width=hand_width, border_color=secondary_color, round_corners=False)
+        return Image.alpha_composite(bg, canvas)
+
+    def draw_word_clock(self, dimensions, time, primary_color=(0,0,0), secondary_color=(255,255,255)):
+        bg, ghost, letter_boxes = Clock.draw_word_static(tuple(dimensions), primary_color, secondary_color)
+        canvas = ghost.copy()
+        image_draw = ImageDraw.Draw(canvas)
+
+        fnt = get_font("Napoli", min(dimensions)*0.05)
 
-        Clock.drew_clock_center(image_draw._image, max(int(dim*0.014), 1), primary_color, secondary_color, width=max(int(dim* 0.007), 1))
+        letter_positions = Clock.translate_word_grid_positions(time.hour % 12, time.minute)
+        for y, x in letter_positions:
+            letter = WORD_CLOCK_GRID[y][x]
+            (x_pos, y_pos), box = letter_boxes[y][x]
 
-        combined = Image.alpha_composite(bg, canvas)    
+            # replace the ghosted letter with the highlighted one
+            image_draw.rectangle(box, fill=(0, 0, 0, 0))
+            image_draw.text((x_pos+2, y_pos+2), letter, anchor="mm", fill=secondary_color+(80,), font=fnt)
+            image_draw.text((x_pos, y_pos), letter, anchor="mm", fill=secondary_color+(255,), font=fnt)
 
+        combined = Image.alpha_composite(bg, canvas)
         return combined
 
-    def draw_word_clock(self, dimensions, time, primary_color=(0,0,0), secondary_color=(255,255,255)):
+    @staticmethod
+    @lru_cache(maxsize=STATIC_LAYER_CACHE_SIZE)
+    def draw_word_static(dimensions, primary_color, secondary_color):
+        """
+        Draw the background and the ghosted letter grid of the word clock, cached per resolution and colors.
+
+        :return: A tuple (background, letters, letter_boxes) where letter_boxes holds the position and the
+                bounding box of every letter, including its highlight shadow, in the layout of WORD_CLOCK_GRID.
+                The images are shared between renders and must be copied before drawing on them.
+        """
         w,h = dimensions
 
         bg = Image.new("RGBA", dimensions, primary_color+(255,))
@@ -183,36 +270,27 @@ class Clock(BasePlugin):
         elif h > w:
             border[1] += (h-w)/2
 
-        letter_positions = Clock.translate_word_grid_positions(time.hour % 12, time.minute)
-
-        letter_grid = [
-            ['I','T','L','I','S','A','S','A','M','P','M'],
-            ['A','C','Q','U','A','R','T','E','R','D','C'],
-            ['T','W','E','N','T','Y','F','I','V','E','X'],
-            ['H','A','L','F','S','T','E','N','F','T','O'],
-            ['P','A','S','T','E','R','U','N','I','N','E'],
-            ['O','N','E','S','I','X','T','H','R','E','E'],
-            ['F','O','U','R','F','I','V','E','T','W','O'],
-            ['E','I','G','H','T','E','L','E','V','E','N'],
-            ['S','E','V','E','N','T','W','E','L','V','E'],
-            ['T','E','N','S','E','O','C','L','O','C','K'],
-        ]
-
+        letter_boxes = []
         canvas_size = min(w,h) - min(border)*2
-        for y, row in enumerate(letter_grid):
+        for y, row in enumerate(WORD_CLOCK_GRID):
+            row_boxes = []
             for x, letter in enumerate(row):
                 x_pos = x*(canvas_size/(len(row)-1)) + border[0] 
-                y_pos = y*(canvas_size/(len(letter_grid)-1)) + border[1]
+                y_pos = y*(canvas_size/(len(WORD_CLOCK_GRID)-1)) + border[1]
 
-                fill=secondary_color+(50,)
-                if [y,x] in letter_positions:
-                    fill=secondary_color+(255,)
-                    image_draw.text((x_pos+2, y_pos+2), letter, anchor="mm", fill=secondary_color+(80,), font=fnt)
-                
-                image_draw.text((x_pos, y_pos), letter, anchor="mm", fill=fill, font=fnt)
+                left, top, right, bottom = image_draw.textbbox((x_pos, y_pos), letter, anchor="mm", font=fnt)
+                # the highlight shadow is offset by 2 pixels
+                row_boxes.append(((x_pos, y_pos), (left, top, right+2, bottom+2)))
 
-        combined = Image.alpha_composite(bg, canvas)
-        return combined
+                image_draw.text((x_pos, y_pos), letter, anchor="mm", fill=secondary_color+(50,), font=fnt)
+            letter_boxes.append(row_boxes)
+
+        return bg, canvas, letter_boxes
+
+    @staticmethod
+    def get_timezone(device_config):
+        timezone_name = device_config.get_config("timezone") or DEFAULT_TIMEZONE
+        return pytz.timezone(timezone_name)
 
     @staticmethod
     def format_time(hour, minute, zero_pad=False):
@@ -225,38 +303,57 @@ class Clock(BasePlugin):
         return f"{hour_str}:{minute_str}"
 
     @staticmethod
-    def draw_gradient_image(w, h, start_angle, end_angle, start_color, end_color):
+    def draw_gradient_image(w, h, hour_angle, minute_angle, start_color, end_color):
         """
-        Draw a gradient that starts at start_angle and ends at end_angle, using RGBA colors.
-        Angles are interpreted for a clock face (0 at 12 o'clock, increasing clockwise).
+        Draw the gradients of both hands in a single pass, using opaque RGB(A) colors.
+        The hour gradient runs from the hour hand to the minute hand and the minute gradient
+        covers the rest of the circle, both going from start_color to end_color.
+        Angles are the hand angles returned by calculate_clock_angles.
         """
-        x,y = np.ogrid[:h,:w]
-        cx,cy = h/2, w/2
-
-        start_angle = -start_angle
-        end_angle = -end_angle
-
-        theta = (np.arctan2(x-cx,y-cy) - start_angle)  % (2*np.pi)
-
-        angle_range = ((end_angle-start_angle) % (2 * np.pi))
-        if angle_range == 0:
-            angle_range = 2*np.pi  # Special case: full circle gradient
-
-        anglemask = theta <= angle_range
-        theta = theta / angle_range  # Normalize to [0, 1] within range
+        full_circle = 2*np.pi
+        angle_field = get_angle_field(w, h)
+
+        minute_range = (minute_angle - hour_angle) % full_circle
+        if minute_range == 0:
+            minute_range = full_circle  # Special case: hands overlap, full circle gradient
+        hour_range = (hour_angle - minute_angle) % full_circle
+
+        # Position of every pixel within the minute gradient, normalized to [0, 1]
+        theta = Clock.wrap_angles(angle_field + minute_angle)
+        minute_mask = theta <= minute_range
+        theta /= minute_range
+
+        # The hour gradient fills the rest of the circle, the minute gradient is drawn over it
+        visible = minute_mask
+        if hour_range:
+            hour_theta = Clock.wrap_angles(angle_field + hour_angle)
+            hour_mask = (hour_theta <= hour_range) & ~minute_mask
+            np.divide(hour_theta, hour_range, out=theta, where=hour_mask)
+            visible = visible | hour_mask
+
+        # Interpolate all channels at once as planes, the gradient array is a view on the RGBA buffer
+        start_color = np.array(Clock.pad_color(start_color), dtype=np.float64)[:, np.newaxis, np.newaxis]
+        end_color = np.array(Clock.pad_color(end_color), dtype=np.float64)[:, np.newaxis, np.newaxis]
+        buffer = bytearray(w * h * 4)
+        gradient = np.frombuffer(buffer, dtype=np.uint8).reshape(h, w, 4)
+        planes = np.moveaxis(gradient, 2, 0)
+        np.copyto(planes, start_color * (1 - theta) + end_color * theta, casting="unsafe")
+        # channels with equal endpoints (usually alpha) are constant, avoid float rounding truncating 255 to 254
+        constant = (start_color == end_color).ravel()
+        planes[constant] = start_color[constant]
+        gradient[~visible] = 0
+        return Image.frombuffer("RGBA", (w, h), buffer, "raw", "RGBA", 0, 1)
 
-        # Interpolate colors between start and end within the mask
-        gradient = np.zeros((h, w, 4), dtype=np.uint8)
-        start_color = Clock.pad_color(start_color)
-        end_color = Clock.pad_color(end_color)
-        for c in range(4):  # Iterate through RGBA channels
-            gradient[..., c] = (
-                start_color[c] * (1 - theta) + end_color[c] * (theta)
-            ).astype(np.uint8)
-        
-        # Fill with the specified solid color
-        gradient[~anglemask] = (0, 0, 0, 0)
-        return Image.fromarray(gradient, mode="RGBA")
+    @staticmethod
+    def wrap_angles(angles):
+        """
+        Wrap angles in [-2pi, 4pi) into [0, 2pi) in place, same result as np.mod(angles, 2pi)
+        for this range but without the cost of a floating point modulo over the whole grid.
+        """
+        full_circle = 2*np.pi
+        angles[angles < 0] += full_circle
+        angles[angles >= full_circle] -= full_circle
+        return angles
 
     @staticmethod
     def pad_color(color):
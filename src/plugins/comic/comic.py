@@ -2,7 +2,8 @@ from plugins.base_plugin.base_plugin import BasePlugin
 from PIL import Image
 import feedparser
 import re
-import requests
+from utils.http_client import http_client
+from utils.image_utils import download_image
 
 COMICS = [
     "XKCD",
@@ -34,36 +35,40 @@ class Comic(BasePlugin):
             dimensions = dimensions[::-1]
         width, height = dimensions
         
-        response = requests.get(image_url, stream=True)
-        response.raise_for_status()
-
-        with Image.open(response.raw) as img:
-            img.thumbnail((width, height), Image.LANCZOS)
-            background = Image.new("RGB", (width, height), "white")
-            background.paste(img, ((width - img.width) // 2, (height - img.height) // 2))
-            return background
+        img = download_image(image_url, dimensions)
+        img.thumbnail((width, height), Image.LANCZOS)
+        background = Image.new("RGB", (width, height), "white")
+        background.paste(img, ((width - img.width) // 2, (height - img.height) // 2))
+        return background
 
     def get_image_url(self, comic):
         if comic == "XKCD":
-            feed = feedparser.parse("https://xkcd.com/atom.xml")
+            feed = self.parse_feed("https://xkcd.com/atom.xml")
             element = feed.entries[0].summary
         elif comic == "Saturday Morning Breakfast Cereal":
-            feed = feedparser.parse("http://www.smbc-comics.com/comic/rss")
+            feed = self.parse_feed("http://www.smbc-comics.com/comic/rss")
             element = feed.entries[0].description
         elif comic == "Questionable Content":
-            feed = feedparser.parse("http://www.questionablecontent.net/QCRSS.xml")
+            feed = self.parse_feed("http://www.questionablecontent.net/QCRSS.xml")
             element = feed.entries[0].description
         elif comic == "The Perry Bible Fellowship":
-            feed = feedparser.parse("https://pbfcomics.com/feed/")
+            feed = self.parse_feed("https://pbfcomics.com/feed/")
             element = feed.entries[0].description
         elif comic == "Poorly Drawn Lines":
-            feed = feedparser.parse("https://poorlydrawnlines.com/feed/")
+            feed = self.parse_feed("https://poorlydrawnlines.com/feed/")
             element = feed.entries[0].get('content', [{}])[0].get('value', '')
         elif comic == "Dinosaur Comics":
-            feed = feedparser.parse("https://www.qwantz.com/rssfeed.php")
+            feed = self.parse_feed("https://www.qwantz.com/rssfeed.php")
             element = feed.entries[0].summary
         elif comic == "Cyanide & Happiness":
-            feed = feedparser.parse("https://explosm-1311.appspot.com/")
+            feed = self.parse_feed("https://explosm-1311.appspot.com/")
             element = feed.entries[0].summary
         src = re.search(r'<img[^>]+src=["\']([^"\']+)["\']', element).group(1)
-        return src
\ No newline at end of file
+        return src
+
+    @staticmethod
+    def parse_feed(feed_url):
+        """Fetches the feed through the shared client, so an unchanged feed is answered with a 304."""
+        response = http_client.get(feed_url, conditional=True)
+        response.raise_for_status()
+        return feedparser.parse(response.content)
@@ -2,55 +2,101 @@ from plugins.base_plugin.base_plugin import BasePlugin
 from PIL import Image, ImageDraw, ImageFont
 import requests
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from utils.http_client import http_client
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+HN_API_URL = "https://hacker-news.firebaseio.com/v0"
+REQUEST_TIMEOUT_SECONDS = 10
+MAX_FETCH_WORKERS = 5
+STORY_CACHE_TTL_SECONDS = 10 * 60
+DEFAULT_FETCH_DEADLINE_SECONDS = 20
+
 
 class HackerNews(BasePlugin):
     def __init__(self, config):
         super().__init__(config)
         self.font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
         self.bold_font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+        # story_id -> (fetch time, story details), shared across refreshes
+        self.story_cache = {}
+        self.story_cache_lock = threading.Lock()
+
+    def fetch_hn_stories(self, num_stories=10, deadline_seconds=DEFAULT_FETCH_DEADLINE_SECONDS):
+        """Fetch top stories from Hacker News API
 
-    def fetch_hn_stories(self, num_stories=10):
-        """Fetch top stories from Hacker News API"""
+        Story details are fetched concurrently and reused for STORY_CACHE_TTL_SECONDS. Stories that haven't
+        arrived once the deadline has passed are left out, the rest keep their top stories order.
+        """
+        deadline = time.monotonic() + deadline_seconds
         try:
             # Get top story IDs
-            top_stories_url = "https://hacker-news.firebaseio.com/v0/topstories.json"
-            response = requests.get(top_stories_url, timeout=10)
+            top_stories_url = f"{HN_API_URL}/topstories.json"
+            response = http_client.get(top_stories_url, timeout=min(REQUEST_TIMEOUT_SECONDS, deadline_seconds))
             response.raise_for_status()
             story_ids = response.json()[:num_stories]
-
-            stories = []
-            for story_id in story_ids:
-                # Fetch each story's details
-                story_url = (
-                    f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json"
-                )
-                story_response = requests.get(story_url, timeout=10)
-                story_response.raise_for_status()
-                story_data = story_response.json()
-
-                if story_data:
-                    stories.append(
-                        {
-                            "title": story_data.get("title", "No title"),
-                            "score": story_data.get("score", 0),
-                            "descendants": story_data.get(
-                                "descendants", 0
-                            ),  # comments count
-                            "url": story_data.get("url", ""),
-                            "by": story_data.get("by", "unknown"),
-                        }
-                    )
-
-            return stories
-
         except requests.RequestException as e:
             logger.error(f"Error fetching HN stories: {e}")
             raise RuntimeError(f"Failed to fetch Hacker News stories: {e}")
 
+        stories_by_id = self.get_cached_stories(story_ids)
+        missing_ids = [story_id for story_id in story_ids if story_id not in stories_by_id]
+        if missing_ids:
+            executor = ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(missing_ids)))
+            futures = {executor.submit(self.fetch_story, story_id): story_id for story_id in missing_ids}
+            done, not_done = wait(futures, timeout=max(0, deadline - time.monotonic()))
+            # don't wait for stragglers, they finish in the background and still fill the cache
+            executor.shutdown(wait=False, cancel_futures=True)
+
+            for future in done:
+                try:
+                    stories_by_id[futures[future]] = future.result()
+                except Exception as e:
+                    # a slow or broken story is left out instead of failing the render
+                    logger.warning(f"Error fetching HN story. | story_id: {futures[future]} | error: {e}")
+            if not_done:
+                logger.warning(f"HN story fetch deadline reached, rendering without {len(not_done)} stories. | deadline_seconds: {deadline_seconds}")
+
+        stories = [stories_by_id[story_id] for story_id in story_ids if stories_by_id.get(story_id)]
+        if not stories:
+            raise RuntimeError("Failed to fetch Hacker News stories, please check logs.")
+        return stories
+
+    def fetch_story(self, story_id):
+        """Fetch a single story's details and add it to the story cache"""
+        story_response = http_client.get(f"{HN_API_URL}/item/{story_id}.json", timeout=REQUEST_TIMEOUT_SECONDS)
+        story_response.raise_for_status()
+        story_data = story_response.json()
+
+        story = None
+        if story_data:
+            story = {
+                "title": story_data.get("title", "No title"),
+                "score": story_data.get("score", 0),
+                "descendants": story_data.get(
+                    "descendants", 0
+                ),  # comments count
+                "url": story_data.get("url", ""),
+                "by": story_data.get("by", "unknown"),
+            }
+
+        with self.story_cache_lock:
+            self.story_cache[story_id] = (time.monotonic(), story)
+        return story
+
+    def get_cached_stories(self, story_ids):
+        """Return the stories fetched within the TTL, dropping expired entries from the cache"""
+        now = time.monotonic()
+        with self.story_cache_lock:
+            for story_id, (fetched_at, _) in list(self.story_cache.items()):
+                if now - fetched_at > STORY_CACHE_TTL_SECONDS:
+                    del self.story_cache[story_id]
+            return {story_id: self.story_cache[story_id][1] for story_id in story_ids if story_id in self.story_cache}
+
     def truncate_text(self, text, max_width, draw, font):
         """Truncate text to fit within max_width pixels"""
         if draw.textbbox((0, 0), text, font=font)[2] <= max_width:
@@ -86,6 +132,10 @@ class HackerNews(BasePlugin):
         text_color = settings.get("text_color", "black")
         bg_color = settings.get("bg_color", "white")
         show_author = settings.get("show_author", "false") == "true"
+        try:
+            fetch_deadline = float(settings.get("fetch_deadline") or DEFAULT_FETCH_DEADLINE_SECONDS)
+        except ValueError:
+            raise RuntimeError("Fetch deadline must be a number.")
 
         # Create image
         image = Image.new("RGB", (width, height), bg_color)
@@ -112,7 +162,7 @@ class HackerNews(BasePlugin):
             meta_font = ImageFont.load_default()
 
         # Fetch stories
-        stories = self.fetch_hn_stories(num_stories)
+        stories = self.fetch_hn_stories(num_stories, fetch_deadline)
 
         # Draw header
         header_text = "Hacker News Top Stories"
@@ -1,31 +1,17 @@
 from plugins.base_plugin.base_plugin import BasePlugin
+from plugins.image_folder.image_index import ImageFolderIndex
 from PIL import Image, ImageOps, ImageFilter
-from io import BytesIO
 import logging
 import os
-import requests
-import random
+import threading
+from utils.image_utils import load_image
 
 logger = logging.getLogger(__name__)
 
-def list_files_in_folder(folder_path):
-    """Return a list of image file paths in the given folder, excluding hidden files."""
-    image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp')
-    return [
-        os.path.join(folder_path, f)
-        for f in os.listdir(folder_path)
-        if (
-            os.path.isfile(os.path.join(folder_path, f))
-            and f.lower().endswith(image_extensions)
-            and not f.startswith('.')
-        )
-    ]
-
 def grab_image(image_path, dimensions, pad_image):
     """Load an image from disk, auto-orient it, and resize to fit within the specified dimensions, preserving aspect ratio."""
     try:
-        img = Image.open(image_path)
-        img = ImageOps.exif_transpose(img)  # Correct orientation using EXIF
+        img = load_image(image_path, dimensions)  # Decodes near the display size and corrects orientation using EXIF
         img = ImageOps.contain(img, dimensions, Image.LANCZOS)
 
         if pad_image:
@@ -40,9 +26,25 @@ def grab_image(image_path, dimensions, pad_image):
         return None
 
 class ImageFolder(BasePlugin):
+    def __init__(self, config, **dependencies):
+        super().__init__(config, **dependencies)
+        # one index per folder, kept in memory between refreshes and persisted to disk
+        self.indexes = {}
+        self.indexes_lock = threading.Lock()
+
+    def get_index(self, folder_path, recursive):
+        key = (os.path.abspath(folder_path), recursive)
+        with self.indexes_lock:
+            index = self.indexes.get(key)
+            if index is None:
+                index = ImageFolderIndex(folder_path, recursive)
+                self.indexes[key] = index
+            return index
+
     def generate_image(self, settings, device_config):
         folder_path = settings.get('folder_path')
         pad_image = settings.get('padImage', False)
+        include_subfolders = settings.get('includeSubfolders') == "true"
         if not folder_path:
             raise RuntimeError("Folder path is required.")
         
@@ -58,15 +60,16 @@ class ImageFolder(BasePlugin):
 
         logger.info(f"Grabbing a random image from: {folder_path}")
 
-        image_files = list_files_in_folder(folder_path)
-        if not image_files:
-            raise RuntimeError(f"No image files found in folder: {folder_path}")
+        index = self.get_index(folder_path, include_subfolders)
+        index.update()
 
-        image_url = random.choice(image_files)
+        image_path, image_info = index.get_random_image()
+        if not image_path:
+            raise RuntimeError(f"No image files found in folder: {folder_path}")
 
-        logger.info(f"Random image selected {image_url}")
+        logger.info(f"Random image selected {image_path} | size: {image_info['width']}x{image_info['height']}, orientation: {image_info['orientation']}, images in index: {len(index)}")
 
-        image = grab_image(image_url, dimensions, pad_image)
+        image = grab_image(image_path, dimensions, pad_image)
 
         if not image:
             raise RuntimeError("Failed to load image, please check logs.")
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+from PIL import Image
+from utils.app_utils import resolve_path
+
+logger = logging.getLogger(__name__)
+
+IMAGE_INDEX_DIR = resolve_path(os.path.join("cache", "image_folder"))
+IMAGE_INDEX_VERSION = 1
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp')
+
+EXIF_ORIENTATION_TAG = 0x0112
+
+# header metadata read when picking images is written with the next directory change, or once this many accumulate
+HEADER_SAVE_BATCH = 50
+
+# index of the fields stored per image, kept as a list to keep the index file small
+MTIME, SIZE, WIDTH, HEIGHT, ORIENTATION = range(5)
+
+def is_image_file(name):
+    return name.lower().endswith(IMAGE_EXTENSIONS) and not name.startswith('.')
+
+class ImageFolderIndex:
+    """Persistent index of the images in a folder, updated incrementally between refreshes.
+
+    For every directory the index keeps its modification time along with the image files and subfolders
+    it contained. Adding, removing or renaming an entry changes the mtime of its parent directory, so an
+    update only stats the directories and rescans those whose mtime changed. Images are stored with their
+    mtime, size, dimensions and EXIF orientation, the latter two read from the image header the first time
+    an image is picked. The relative paths are also kept in a list so a random image is picked in O(1).
+
+    Picking an image never writes the index file. Header metadata is persisted along with the next update
+    that changes a directory, or once HEADER_SAVE_BATCH images have been read since the last save.
+
+    Attributes:
+        folder_path (str): Folder being indexed.
+        recursive (bool): Whether images in subfolders are included.
+        index_path (str): File the index is persisted to.
+        dirs (dict): Relative directory path -> {"mtime", "files", "subdirs"}.
+        files (dict): Relative image path -> [mtime, size, width, height, orientation].
+    """
+
+    def __init__(self, folder_path, recursive=False, index_dir=IMAGE_INDEX_DIR):
+        self.folder_path = os.path.abspath(folder_path)
+        self.recursive = recursive
+        self.index_path = os.path.join(index_dir, f"{self._get_index_key(self.folder_path, recursive)}.json")
+        self.lock = threading.Lock()
+        self.dirs = {}
+        self.files = {}
+        self.paths = []
+        self.positions = {}
+        self.dirty = False
+        self.unsaved_headers = 0
+        self._load()
+
+    def update(self):
+        """Brings the index up to date with the folder, rescanning only the directories that changed."""
+        with self.lock:
+            seen = set()
+            pending = [""]
+            rescanned = 0
+            while pending:
+                rel_dir = pending.pop()
+                seen.add(rel_dir)
+                try:
+                    mtime = os.stat(os.path.join(self.folder_path, rel_dir)).st_mtime_ns
+                except OSError:
+                    seen.discard(rel_dir)
+                    continue
+
+                entry = self.dirs.get(rel_dir)
+                if entry is None or entry["mtime"] != mtime:
+                    entry = self._scan_dir(rel_dir, mtime)
+                    rescanned += 1
+                if self.recursive:
+                    pending.extend(os.path.join(rel_dir, name) for name in entry["subdirs"])
+
+            for rel_dir in set(self.dirs) - seen:
+                self._remove_dir(rel_dir)
+
+            if rescanned:
+                logger.info(f"Updated image folder index. | folder: {self.folder_path}, rescanned directories: {rescanned}, images: {len(self.paths)}")
+            if self.dirty or self.unsaved_headers >= HEADER_SAVE_BATCH:
+                self._save()
+
+    def get_random_image(self):
+        """Returns the absolute path and metadata of a random image, or (None, None) if the index is empty."""
+        with self.lock:
+            while self.paths:
+                rel_path = random.choice(self.paths)
+                info = self._get_image_info(rel_path)
+                # None when the image was removed since the last update, pick among the remaining ones
+                if info is not None:
+                    return os.path.join(self.folder_path, rel_path), info
+            return None, None
+
+    def __len__(self):
+        return len(self.paths)
+
+    def _scan_dir(self, rel_dir, mtime):
+        old_entry = self.dirs.get(rel_dir, {"files": [], "subdirs": []})
+        files, subdirs = [], []
+        try:
+            with os.scandir(os.path.join(self.folder_path, rel_dir)) as it:
+                for dir_entry in it:
+                    try:
+                        if dir_entry.is_file() and is_image_file(dir_entry.name):
+                            files.append(dir_entry.name)
+                        elif dir_entry.is_dir(follow_symlinks=False) and not dir_entry.name.startswith('.'):
+                            subdirs.append(dir_entry.name)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"Failed to scan directory {os.path.join(self.folder_path, rel_dir)}: {e}")
+
+        new_files = set(files)
+        for name in old_entry["files"]:
+            if name not in new_files:
+                self._remove_file(os.path.join(rel_dir, name))
+        for name in files:
+            rel_path = os.path.join(rel_dir, name)
+            if rel_path not in self.files:
+                self._add_file(rel_path)
+
+        # subfolders that are gone are dropped once update finds they weren't visited
+        entry = {"mtime": mtime, "files": files, "subdirs": subdirs}
+        self.dirs[rel_dir] = entry
+        self.dirty = True
+        return entry
+
+    def _get_image_info(self, rel_path):
+        """Returns the metadata of an image, re-reading its header if the file changed since it was indexed."""
+        info = self.files[rel_path]
+        path = os.path.join(self.folder_path, rel_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._remove_file(rel_path)
+            return None
+
+        if info[WIDTH] is None or info[MTIME] != stat.st_mtime_ns or info[SIZE] != stat.st_size:
+            width, height, orientation = None, None, None
+            try:
+                # opening only parses the header, the pixel data isn't decoded
+                with Image.open(path) as img:
+                    width, height = img.size
+                    orientation = img.getexif().get(EXIF_ORIENTATION_TAG, 1)
+            except Exception as e:
+                logger.warning(f"Failed to read image header {path}: {e}")
+            info[:] = [stat.st_mtime_ns, stat.st_size, width, height, orientation]
+            self.unsaved_headers += 1
+
+        return {"mtime": info[MTIME], "size": info[SIZE], "width": info[WIDTH],
+                "height": info[HEIGHT], "orientation": info[ORIENTATION]}
+
+    def _add_file(self, rel_path):
+        self.files[rel_path] = [None, None, None, None, None]
+        self.positions[rel_path] = len(self.paths)
+        self.paths.append(rel_path)
+
+    def _remove_file(self, rel_path):
+        if rel_path not in self.files:
+            return
+        del self.files[rel_path]
+        # swap the last path into the freed slot to keep removal O(1)
+        position = self.positions.pop(rel_path)
+        last_path = self.paths.pop()
+        if last_path != rel_path:
+            self.paths[position] = last_path
+            self.positions[last_path] = position
+        self.dirty = True
+
+    def _remove_dir(self, rel_dir):
+        entry = self.dirs.pop(rel_dir)
+        for name in entry["files"]:
+            self._remove_file(os.path.join(rel_dir, name))
+        self.dirty = True
+
+    def _load(self):
+        if not os.path.isfile(self.index_path):
+            return
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to read image folder index {self.index_path}: {e}")
+            return
+
+        if data.get("version") != IMAGE_INDEX_VERSION or data.get("folder_path") != self.folder_path:
+            return
+        self.dirs = data.get("dirs", {})
+        self.files = data.get("files", {})
+        self.paths = list(self.files)
+        self.positions = {rel_path: position for position, rel_path in enumerate(self.paths)}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({
+                    "version": IMAGE_INDEX_VERSION,
+                    "folder_path": self.folder_path,
+                    "recursive": self.recursive,
+                    "dirs": self.dirs,
+                    "files": self.files
+                }, f, separators=(",", ":"))
+            os.replace(tmp_path, self.index_path)
+            self.dirty = False
+            self.unsaved_headers = 0
+        except Exception as e:
+            logger.warning(f"Failed to write image folder index {self.index_path}: {e}")
+
+    @staticmethod
+    def _get_index_key(folder_path, recursive):
+        return hashlib.sha256(f"{folder_path}|{recursive}".encode("utf-8")).hexdigest()
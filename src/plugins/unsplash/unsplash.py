@@ -1,18 +1,17 @@
 from plugins.base_plugin.base_plugin import BasePlugin
 from PIL import Image
-from io import BytesIO
 import requests
 import logging
+from utils.http_client import http_client
+from utils.image_utils import download_image
 import random
 
 logger = logging.getLogger(__name__)
 
-def grab_image(image_url, dimensions, timeout_ms=40000):
+def grab_image(image_url, dimensions, timeout_ms=40000, params=None):
     """Grab an image from a URL and resize it to the specified dimensions."""
     try:
-        response = requests.get(image_url, timeout=timeout_ms / 1000)
-        response.raise_for_status()
-        img = Image.open(BytesIO(response.content))
+        img = download_image(image_url, dimensions, timeout=timeout_ms / 1000, params=params)
         img = img.resize(dimensions, Image.LANCZOS)
         return img
     except Exception as e:
@@ -51,16 +50,16 @@ class Unsplash(BasePlugin):
             params['orientation'] = orientation
 
         try:
-            response = requests.get(url, params=params)
+            response = http_client.get(url, params=params)
             response.raise_for_status()
             data = response.json()
             if search_query:
                 results = data.get("results")
                 if not results:
                     raise RuntimeError("No images found for the given search query.")
-                image_url = random.choice(results)["urls"]["full"]
+                image_url = random.choice(results)["urls"]["raw"]
             else:
-                image_url = data["urls"]["full"]
+                image_url = data["urls"]["raw"]
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching image from Unsplash API: {e}")
             raise RuntimeError("Failed to fetch image from Unsplash API, please check logs.")
@@ -73,9 +72,12 @@ class Unsplash(BasePlugin):
         if device_config.get_config("orientation") == "vertical":
             dimensions = dimensions[::-1]
 
+        # have Unsplash crop and scale the raw image to the display size instead of downloading the full image
+        image_params = {"w": dimensions[0], "h": dimensions[1], "fit": "crop"}
+
         logger.info(f"Grabbing image from: {image_url}")
 
-        image = grab_image(image_url, dimensions, timeout_ms=40000)
+        image = grab_image(image_url, dimensions, timeout_ms=40000, params=image_params)
 
         if not image:
             raise RuntimeError("Failed to load image, please check logs.")
@@ -1,8 +1,12 @@
 from plugins.base_plugin.base_plugin import BasePlugin
+from plugins.weather.weather_renderer import WeatherRenderer
 from PIL import Image
 import os
-import requests
+from utils.http_client import http_client
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 import pytz
 from io import BytesIO
@@ -32,13 +36,63 @@ GEOCODING_URL = "http://api.openweathermap.org/geo/1.0/reverse?lat={lat}&lon={lo
 
 OPEN_METEO_FORECAST_URL = "https://api.open-meteo.com/v1/forecast?latitude={lat}&longitude={long}&hourly=temperature_2m,precipitation_probability,relative_humidity_2m,surface_pressure,visibility&daily=weathercode,temperature_2m_max,temperature_2m_min,sunrise,sunset&current_weather=true&timezone=auto&models=best_match&forecast_days={forecast_days}"
 OPEN_METEO_AIR_QUALITY_URL = "https://air-quality-api.open-meteo.com/v1/air-quality?latitude={lat}&longitude={long}&hourly=pm10,pm2_5,carbon_monoxide,nitrogen_dioxide,sulphur_dioxide,ozone,aerosol_optical_depth,uv_index,uv_index_clear_sky&timezone=auto"
+# Mean length of a lunar cycle and a known new moon, used to compute the moon phase locally
+SYNODIC_MONTH_DAYS = 29.530588853
+REFERENCE_NEW_MOON = datetime(2000, 1, 6, 18, 14, tzinfo=timezone.utc)
+
+MOON_PHASES = [
+    (0.0, "newmoon"),
+    (0.25, "firstquarter"),
+    (0.5, "fullmoon"),
+    (0.75, "lastquarter"),
+    (1.0, "newmoon"),
+]
+
+OPEN_METEO_FORECAST_DAYS = 7
+
+# How long a provider response is reused across plugin instances showing the same location
+DEFAULT_CACHE_MINUTES = 10
+
 OPEN_METEO_UNIT_PARAMS = {
     "standard": "temperature_unit=kelvin&wind_speed_unit=ms&precipitation_unit=mm",
     "metric":   "temperature_unit=celsius&wind_speed_unit=ms&precipitation_unit=mm",
     "imperial": "temperature_unit=fahrenheit&wind_speed_unit=mph&precipitation_unit=inch"
 }
 
+def calculate_moon_phase(dt):
+    """Returns the moon phase at the given aware datetime as a fraction of the lunar cycle, 0.0 being a new moon."""
+    days_since_new_moon = (dt - REFERENCE_NEW_MOON).total_seconds() / 86400
+    return (days_since_new_moon / SYNODIC_MONTH_DAYS) % 1.0
+
+def choose_moon_phase_name(phase, abs_tol=1e-3):
+    """Maps a moon phase fraction to its icon name, phases within abs_tol of a principal phase get its name."""
+    for target, name in MOON_PHASES:
+        if math.isclose(phase, target, abs_tol=abs_tol):
+            return name
+    if 0.0 < phase < 0.25:
+        return "waxingcrescent"
+    elif 0.25 < phase < 0.5:
+        return "waxinggibbous"
+    elif 0.5 < phase < 0.75:
+        return "waninggibbous"
+    else:
+        return "waningcrescent"
+
+def moon_illumination(phase):
+    """Returns the illuminated fraction of the moon for a moon phase fraction."""
+    return (1 - math.cos(2 * math.pi * phase)) / 2
+
 class Weather(BasePlugin):
+    def __init__(self, config, **dependencies):
+        super().__init__(config, **dependencies)
+        # reverse geocoding results per (lat, long), a location's name doesn't change
+        self.location_cache = {}
+        self.location_cache_lock = threading.Lock()
+        # (provider, lat, long, units) -> (fetch time, weather data, air quality data), shared by all instances
+        self.response_cache = {}
+        self.revalidating = set()
+        self.response_cache_lock = threading.Lock()
+
     def generate_settings_template(self):
         template_params = super().generate_settings_template()
         template_params['api_key'] = {
@@ -61,6 +115,7 @@ class Weather(BasePlugin):
 
         weather_provider = settings.get('weatherProvider', 'OpenWeatherMap')
         title = settings.get('customTitle', '')
+        cache_ttl = self.get_cache_ttl(settings)
 
         timezone = device_config.get_config("timezone", default="America/New_York")
         time_format = device_config.get_config("time_format", default="12h")
@@ -71,10 +126,13 @@ class Weather(BasePlugin):
                 api_key = device_config.load_env_key("OPEN_WEATHER_MAP_SECRET")
                 if not api_key:
                     raise RuntimeError("Open Weather Map API Key not configured.")
-                weather_data = self.get_weather_data(api_key, units, lat, long)
-                aqi_data = self.get_air_quality(api_key, lat, long)
+                # the location lookup is fetched along with the weather and air quality requests
+                location_task = None
                 if settings.get('titleSelection', 'location') == 'location':
-                    title = self.get_location(api_key, lat, long)
+                    location_task = lambda: self.get_location(api_key, lat, long)
+                weather_data, aqi_data, location = self.get_cached_provider_data(weather_provider, lat, long, units, cache_ttl, api_key, location_task)
+                if location_task:
+                    title = location
                 if settings.get('weatherTimeZone', 'locationTimeZone') == 'locationTimeZone':
                     logger.info("Using location timezone for OpenWeatherMap data.")
                     wtz = self.parse_timezone(weather_data)
@@ -83,9 +141,7 @@ class Weather(BasePlugin):
                     logger.info("Using configured timezone for OpenWeatherMap data.")
                     template_params = self.parse_weather_data(weather_data, aqi_data, tz, units, time_format)
             elif weather_provider == "OpenMeteo":
-                forecast_days = 7
-                weather_data = self.get_open_meteo_data(lat, long, units, forecast_days + 1)
-                aqi_data = self.get_open_meteo_air_quality(lat, long)
+                weather_data, aqi_data, _ = self.get_cached_provider_data(weather_provider, lat, long, units, cache_ttl)
                 template_params = self.parse_open_meteo_data(weather_data, aqi_data, tz, units, time_format)
             else:
                 raise RuntimeError(f"Unknown weather provider: {weather_provider}")
@@ -109,12 +165,25 @@ class Weather(BasePlugin):
             last_refresh_time = now.strftime("%Y-%m-%d %I:%M %p")
         template_params["last_refresh_time"] = last_refresh_time
 
-        image = self.render_image(dimensions, "weather.html", "weather.css", template_params)
+        if settings.get('renderBackend') == 'native':
+            image = WeatherRenderer(dimensions, template_params).render()
+        else:
+            image = self.render_image(dimensions, "weather.html", "weather.css", template_params, block_network=True)
 
         if not image:
             raise RuntimeError("Failed to take screenshot, please check logs.")
         return image
 
+    @staticmethod
+    def get_cache_ttl(settings):
+        """Returns how long provider responses are reused in seconds, the default if the setting is empty or invalid."""
+        try:
+            cache_minutes = int(settings.get('cacheMinutes') or DEFAULT_CACHE_MINUTES)
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid cache duration, using the default. | cacheMinutes: {settings.get('cacheMinutes')}")
+            cache_minutes = DEFAULT_CACHE_MINUTES
+        return max(cache_minutes, 0) * 60
+
     def parse_weather_data(self, weather_data, aqi_data, tz, units, time_format):
         current = weather_data.get("current")
         dt = datetime.fromtimestamp(current.get('dt'), tz=timezone.utc).astimezone(tz)
@@ -198,27 +267,6 @@ class Weather(BasePlugin):
         - daily_forecast: list of daily entries from One‑Call v3 (each has 'dt', 'weather', 'temp', 'moon_phase')
         - tz: your target tzinfo (e.g. from zoneinfo or pytz)
         """
-        PHASES = [
-            (0.0, "newmoon"),
-            (0.25, "firstquarter"),
-            (0.5, "fullmoon"),
-            (0.75, "lastquarter"),
-            (1.0, "newmoon"),
-        ]
-
-        def choose_phase_name(phase: float) -> str:
-            for target, name in PHASES:
-                if math.isclose(phase, target, abs_tol=1e-3):
-                    return name
-            if 0.0 < phase < 0.25:
-                return "waxingcrescent"
-            elif 0.25 < phase < 0.5:
-                return "waxinggibbous"
-            elif 0.5 < phase < 0.75:
-                return "waninggibbous"
-            else:
-                return "waningcrescent"
-
         forecast = []
         for day in daily_forecast:
             # --- weather icon ---
@@ -229,11 +277,10 @@ class Weather(BasePlugin):
 
             # --- moon phase & icon ---
             moon_phase = float(day["moon_phase"])  # [0.0–1.0]
-            phase_name = choose_phase_name(moon_phase)
+            phase_name = choose_moon_phase_name(moon_phase)
             moon_icon_path = self.get_plugin_dir(f"icons/{phase_name}.png")
             # --- true illumination percent, no decimals ---
-            illum_fraction = (1 - math.cos(2 * math.pi * moon_phase)) / 2
-            moon_pct = f"{illum_fraction * 100:.0f}"
+            moon_pct = f"{moon_illumination(moon_phase) * 100:.0f}"
 
             # --- date & temps ---
             dt = datetime.fromtimestamp(day["dt"], tz=timezone.utc).astimezone(tz)
@@ -254,7 +301,7 @@ class Weather(BasePlugin):
 
     def parse_open_meteo_forecast(self, daily_data, tz):
         """
-        Parse the daily forecast from Open-Meteo API and inject moon phase from Farmsense API.
+        Parse the daily forecast from Open-Meteo API and inject the locally computed moon phase.
         """
         times = daily_data.get('time', [])
         weather_codes = daily_data.get('weathercode', [])
@@ -271,19 +318,10 @@ class Weather(BasePlugin):
             weather_icon = self.map_weather_code_to_icon(code, 12)
             weather_icon_path = self.get_plugin_dir(f"icons/{weather_icon}.png")
 
-            timestamp = int(dt.replace(hour=12, minute=0, second=0).timestamp())
-            api_url = f"https://api.farmsense.net/v1/moonphases/?d={timestamp}"
-           
-            try:
-                resp = requests.get(api_url, verify=False)
-                moon = resp.json()[0]
-                phase_raw = moon.get("Phase", "New Moon")
-                illum_pct = float(moon.get("Illumination", 0)) * 100
-                phase_name = phase_raw.lower().replace(" ", "")
-                phase_name = "newmoon" if phase_name == "darkmoon" else phase_name
-            except Exception:
-                illum_pct = 0
-                phase_name = "newmoon"
+            # phase at midday, the principal phases are shown on the day they occur
+            moon_phase = calculate_moon_phase(dt.replace(hour=12, minute=0, second=0))
+            phase_name = choose_moon_phase_name(moon_phase, abs_tol=0.5 / SYNODIC_MONTH_DAYS)
+            illum_pct = moon_illumination(moon_phase) * 100
 
             moon_icon_path = self.get_plugin_dir(f"icons/{phase_name}.png")
 
@@ -560,9 +598,79 @@ class Weather(BasePlugin):
 
         return data_points
 
+    def get_cached_provider_data(self, weather_provider, lat, long, units, cache_ttl, api_key=None, location_task=None):
+        """Returns the (weather data, air quality data, location) for the location, served from the response cache when possible.
+
+        Responses younger than cache_ttl seconds are returned as is. Responses up to twice as old are returned
+        while a fresh copy is fetched in the background. Otherwise the data is fetched, and if that fails the
+        last good response is used regardless of its age. The location is the result of location_task, which is
+        run along with the requests when the data is fetched, or None if no task is given.
+        """
+        cache_key = (weather_provider, lat, long, units)
+        with self.response_cache_lock:
+            cached = self.response_cache.get(cache_key)
+
+        if cached and cache_ttl > 0:
+            age = time.monotonic() - cached[0]
+            if age <= cache_ttl:
+                logger.info(f"Using cached weather data. | provider: {weather_provider} | age_seconds: {age:.0f}")
+                return cached[1], cached[2], location_task() if location_task else None
+            if age <= 2 * cache_ttl:
+                logger.info(f"Using stale weather data while revalidating. | provider: {weather_provider} | age_seconds: {age:.0f}")
+                self.revalidate_provider_data(cache_key, api_key)
+                return cached[1], cached[2], location_task() if location_task else None
+
+        try:
+            return self.fetch_provider_data(cache_key, api_key, location_task)
+        except Exception as e:
+            if not cached:
+                raise
+            logger.warning(f"Weather request failed, using last good response. | provider: {weather_provider} | "
+                           f"age_seconds: {time.monotonic() - cached[0]:.0f} | error: {e}")
+            return cached[1], cached[2], location_task() if location_task else None
+
+    def revalidate_provider_data(self, cache_key, api_key):
+        """Refreshes the cached response in a background thread, unless a refresh is already running."""
+        with self.response_cache_lock:
+            if cache_key in self.revalidating:
+                return
+            self.revalidating.add(cache_key)
+
+        def revalidate():
+            try:
+                self.fetch_provider_data(cache_key, api_key)
+            except Exception as e:
+                logger.warning(f"Background weather revalidation failed. | provider: {cache_key[0]} | error: {e}")
+            finally:
+                with self.response_cache_lock:
+                    self.revalidating.discard(cache_key)
+
+        threading.Thread(target=revalidate, daemon=True).start()
+
+    def fetch_provider_data(self, cache_key, api_key=None, location_task=None):
+        """Fetches the weather and air quality data, and runs the location task if given, concurrently.
+
+        The data is stored in the response cache, returns (weather data, air quality data, location).
+        """
+        weather_provider, lat, long, units = cache_key
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            location_future = executor.submit(location_task) if location_task else None
+            if weather_provider == "OpenWeatherMap":
+                weather_future = executor.submit(self.get_weather_data, api_key, units, lat, long)
+                aqi_future = executor.submit(self.get_air_quality, api_key, lat, long)
+            else:
+                weather_future = executor.submit(self.get_open_meteo_data, lat, long, units, OPEN_METEO_FORECAST_DAYS + 1)
+                aqi_future = executor.submit(self.get_open_meteo_air_quality, lat, long)
+            weather_data = weather_future.result()
+            aqi_data = aqi_future.result()
+
+        with self.response_cache_lock:
+            self.response_cache[cache_key] = (time.monotonic(), weather_data, aqi_data)
+        return weather_data, aqi_data, location_future.result() if location_future else None
+
     def get_weather_data(self, api_key, units, lat, long):
         url = WEATHER_URL.format(lat=lat, long=long, units=units, api_key=api_key)
-        response = requests.get(url)
+        response = http_client.get(url)
         if not 200 <= response.status_code < 300:
             logging.error(f"Failed to retrieve weather data: {response.content}")
             raise RuntimeError("Failed to retrieve weather data.")
@@ -571,7 +679,7 @@ class Weather(BasePlugin):
 
     def get_air_quality(self, api_key, lat, long):
         url = AIR_QUALITY_URL.format(lat=lat, long=long, api_key=api_key)
-        response = requests.get(url)
+        response = http_client.get(url)
 
         if not 200 <= response.status_code < 300:
             logging.error(f"Failed to get air quality data: {response.content}")
@@ -580,8 +688,13 @@ class Weather(BasePlugin):
         return response.json()
 
     def get_location(self, api_key, lat, long):
+        with self.location_cache_lock:
+            location_str = self.location_cache.get((lat, long))
+        if location_str:
+            return location_str
+
         url = GEOCODING_URL.format(lat=lat, long=long, api_key=api_key)
-        response = requests.get(url)
+        response = http_client.get(url)
 
         if not 200 <= response.status_code < 300:
             logging.error(f"Failed to get location: {response.content}")
@@ -589,13 +702,15 @@ class Weather(BasePlugin):
 
         location_data = response.json()[0]
         location_str = f"{location_data.get('name')}, {location_data.get('state', location_data.get('country'))}"
+        with self.location_cache_lock:
+            self.location_cache[(lat, long)] = location_str
 
         return location_str
 
     def get_open_meteo_data(self, lat, long, units, forecast_days):
         unit_params = OPEN_METEO_UNIT_PARAMS[units]
         url = OPEN_METEO_FORECAST_URL.format(lat=lat, long=long, forecast_days=forecast_days) + f"&{unit_params}"
-        response = requests.get(url)
+        response = http_client.get(url)
         
         if not 200 <= response.status_code < 300:
             logging.error(f"Failed to retrieve Open-Meteo weather data: {response.content}")
@@ -605,7 +720,7 @@ class Weather(BasePlugin):
 
     def get_open_meteo_air_quality(self, lat, long):
         url = OPEN_METEO_AIR_QUALITY_URL.format(lat=lat, long=long)
-        response = requests.get(url)
+        response = http_client.get(url)
         if not 200 <= response.status_code < 300:
             logging.error(f"Failed to retrieve Open-Meteo air quality data: {response.content}")
             raise RuntimeError("Failed to retrieve Open-Meteo air quality data.")
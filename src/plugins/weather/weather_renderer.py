@@ -0,0 +1,344 @@
+"""
+Native Pillow renderer for the weather dashboard.
+
+Draws the same layout as render/weather.html directly from the template params produced by
+Weather.parse_weather_data / Weather.parse_open_meteo_data, so a refresh doesn't need the headless
+browser. Sizes follow the viewport relative units used in render/weather.css.
+"""
+
+import math
+import os
+from functools import lru_cache
+from PIL import Image, ImageChops, ImageColor, ImageDraw
+from utils.app_utils import get_font
+
+TEMPERATURE_LINE_COLOR = (241, 122, 36)
+TEMPERATURE_FILL_COLOR = (252, 204, 5)
+PRECIPITATION_COLOR = (26, 111, 176)
+SEPARATOR_COLOR = (170, 170, 170)
+
+@lru_cache(maxsize=128)
+def load_icon(icon_path, width, height):
+    """Returns the icon scaled to fit within width x height, scaled copies are cached per size."""
+    with Image.open(icon_path) as img:
+        icon = img.convert("RGBA")
+    scale = min(width / icon.width, height / icon.height)
+    size = (max(1, round(icon.width * scale)), max(1, round(icon.height * scale)))
+    return icon.resize(size, Image.LANCZOS)
+
+@lru_cache(maxsize=64)
+def load_font(font_family, font_size, font_weight="normal"):
+    """Returns the font at the given size, loaded fonts are cached."""
+    return get_font(font_family, max(1, int(font_size)), font_weight)
+
+class WeatherRenderer:
+    """Draws the weather dashboard for the given dimensions and template params."""
+
+    def __init__(self, dimensions, template_params):
+        self.width, self.height = dimensions
+        self.params = template_params
+        self.settings = template_params.get("plugin_settings", {})
+        self.text_color = ImageColor.getrgb(self.settings.get("textColor") or "black")
+        self.font_family = "Dogica" if self.width <= 250 else "Jost"
+        self.degree = "°" if template_params.get("units") != "standard" else ""
+
+    def render(self):
+        image = self.create_background()
+        draw = ImageDraw.Draw(image)
+
+        # content box, page margins plus the 1.5vw body padding
+        padding = 0.015 * self.width
+        left = self.get_margin("leftMargin") + padding
+        top = self.get_margin("topMargin") + padding
+        right = self.width - self.get_margin("rightMargin") - padding
+        bottom = self.height - self.get_margin("bottomMargin") - padding
+
+        gap = 0.01 * self.height
+        header_height = 0.15 * self.height
+        chart_height = 0.16 * self.height if self.is_enabled("displayGraph") else 0
+        forecast_height = 0
+        if self.is_enabled("displayForecast") and self.get_forecast_days():
+            forecast_height = self.get_forecast_layout(right - left)["height"]
+        sections = [h for h in (header_height, chart_height, forecast_height) if h]
+        today_height = max(0, (bottom - top) - sum(sections) - gap * len(sections))
+
+        y = top
+        self.draw_header(draw, (left, y, right, y + header_height))
+        y += header_height + gap
+        self.draw_today(image, draw, (left, y, right, y + today_height))
+        y += today_height + gap
+        if chart_height:
+            self.draw_chart(image, (left, y, right, y + chart_height))
+            y += chart_height + gap
+        if forecast_height:
+            self.draw_forecast(image, draw, (left, y, right, y + forecast_height))
+
+        if self.settings.get("displayRefreshTime") == "true":
+            font = load_font(self.font_family, min(0.02 * self.height, 0.02 * self.width), "bold")
+            text = f"Last refresh: {self.params.get('last_refresh_time', '')}"
+            draw.text((self.width - 0.01 * self.width, 0.008 * self.height), text, font=font, fill=self.text_color, anchor="ra")
+
+        return image
+
+    def create_background(self):
+        image = Image.new("RGB", (self.width, self.height), "white")
+        option = self.settings.get("backgroundOption")
+        if option == "color" and self.settings.get("backgroundColor"):
+            image.paste(ImageColor.getrgb(self.settings["backgroundColor"]), (0, 0, self.width, self.height))
+        elif option == "image" and os.path.isfile(self.settings.get("backgroundImageFile") or ""):
+            # background-size: cover, centered
+            with Image.open(self.settings["backgroundImageFile"]) as background:
+                background = background.convert("RGB")
+                scale = max(self.width / background.width, self.height / background.height)
+                size = (math.ceil(background.width * scale), math.ceil(background.height * scale))
+                background = background.resize(size, Image.LANCZOS)
+                offset = ((size[0] - self.width) // 2, (size[1] - self.height) // 2)
+                image.paste(background.crop((offset[0], offset[1], offset[0] + self.width, offset[1] + self.height)))
+        return image
+
+    def draw_header(self, draw, box):
+        left, top, right, bottom = box
+        width, height = right - left, bottom - top
+        center_x = (left + right) / 2
+
+        date_font = load_font(self.font_family, min(0.3 * height, 0.06 * width))
+        title_font = load_font(self.font_family, min(0.5 * height, 0.08 * width), "bold")
+        draw.text((center_x, bottom), self.params.get("current_date", ""), font=date_font, fill=self.text_color, anchor="md")
+        title_bottom = bottom - date_font.size * 1.05
+        draw.text((center_x, title_bottom), self.params.get("title") or "", font=title_font, fill=self.text_color, anchor="md")
+
+    def draw_today(self, image, draw, box):
+        left, top, right, bottom = box
+        width, height = right - left, bottom - top
+        data_points = self.params.get("data_points", []) if self.is_enabled("displayMetrics") else []
+        aspect = self.width / self.height
+
+        if not data_points:
+            self.draw_current(image, draw, box)
+        elif aspect <= 1:
+            # portrait, current conditions stacked above the metrics grid
+            columns = 3 if aspect <= 0.5 else 4
+            rows = math.ceil(len(data_points) / columns)
+            grid_height = min(rows * 0.07 * self.height, height / 2)
+            self.draw_current(image, draw, (left, top, right, bottom - grid_height))
+            self.draw_data_points(image, draw, (left, bottom - grid_height, right, bottom), data_points, columns)
+        else:
+            columns = 3 if aspect >= 2 else 2
+            self.draw_current(image, draw, (left, top, left + width / 2, bottom))
+            self.draw_data_points(image, draw, (left + width / 2, top, right, bottom), data_points, columns)
+
+    def draw_current(self, image, draw, box):
+        left, top, right, bottom = box
+        padding = 0.02 * self.width
+        left, right = left + padding, right - padding
+        width, height = right - left, bottom - top
+        if width <= 0 or height <= 0:
+            return
+
+        # icon and text column share the row
+        icon_size = min(width * 0.45, height * 0.9)
+        icon = load_icon(self.params["current_day_icon"], int(icon_size), int(icon_size))
+        text_left = left + icon_size
+        text_width = right - text_left
+        image.paste(icon, (int(left + (icon_size - icon.width) / 2), int(top + (height - icon.height) / 2)), icon)
+
+        cqmin = min(text_width, height)
+        temp_font = load_font(self.font_family, 0.45 * cqmin)
+        unit_font = load_font(self.font_family, 0.45 * cqmin * 0.4)
+        small_font = load_font(self.font_family, 0.10 * cqmin)
+        min_max_font = load_font(self.font_family, 0.12 * cqmin)
+
+        forecast = self.params.get("forecast") or [{}]
+        lines = [
+            (f"Feels Like {self.params.get('feels_like', '')}{self.degree}", small_font),
+            (f"{forecast[0].get('high', '')}{self.degree} / {forecast[0].get('low', '')}{self.degree}", min_max_font)
+        ]
+        total_height = temp_font.size + sum(font.size * 1.4 for _, font in lines)
+        center_x = text_left + text_width / 2
+        y = top + (height - total_height) / 2
+
+        temperature = self.params.get("current_temperature", "")
+        temp_width = draw.textlength(temperature, font=temp_font)
+        unit = self.params.get("temperature_unit", "")
+        unit_width = draw.textlength(unit, font=unit_font)
+        temp_x = center_x - (temp_width + unit_width) / 2
+        draw.text((temp_x, y), temperature, font=temp_font, fill=self.text_color, anchor="la")
+        draw.text((temp_x + temp_width, y + unit_font.size * 0.6), unit, font=unit_font, fill=self.text_color, anchor="la")
+        y += temp_font.size
+
+        for text, font in lines:
+            draw.text((center_x, y + font.size * 0.2), text, font=font, fill=self.text_color, anchor="ma")
+            y += font.size * 1.4
+
+    def draw_data_points(self, image, draw, box, data_points, columns):
+        left, top, right, bottom = box
+        rows = math.ceil(len(data_points) / columns)
+        column_gap, row_gap = 0.01 * self.width, 0.005 * self.height
+        cell_width = ((right - left) - column_gap * (columns - 1)) / columns
+        cell_height = min(((bottom - top) - row_gap * (rows - 1)) / rows, 0.2 * self.height)
+        grid_top = top + ((bottom - top) - (cell_height * rows + row_gap * (rows - 1))) / 2
+
+        for i, data_point in enumerate(data_points):
+            x = left + (i % columns) * (cell_width + column_gap)
+            y = grid_top + (i // columns) * (cell_height + row_gap)
+
+            icon_width, icon_height = cell_width * 0.25, cell_height * 0.8
+            icon = load_icon(data_point["icon"], max(1, int(icon_width)), max(1, int(icon_height)))
+            image.paste(icon, (int(x + (icon_width - icon.width) / 2), int(y + (cell_height - icon.height) / 2)), icon)
+
+            data_left = x + icon_width
+            data_width = cell_width * 0.75
+            center_x = data_left + data_width / 2
+            label_font = load_font(self.font_family, min(0.32 * cell_height, 0.15 * data_width))
+            value_font = load_font(self.font_family, min(0.46 * cell_height, 0.26 * data_width), "bold")
+            unit_font = load_font(self.font_family, value_font.size * 0.6)
+
+            draw.text((center_x, y + cell_height * 0.3), str(data_point.get("label", "")), font=label_font, fill=self.text_color, anchor="md")
+
+            measurement = str(data_point.get("measurement", ""))
+            unit = str(data_point.get("unit") or "")
+            value_width = draw.textlength(measurement, font=value_font)
+            unit_width = draw.textlength(unit, font=unit_font) + 0.002 * self.width if unit else 0
+            value_x = center_x - (value_width + unit_width) / 2
+            baseline = y + cell_height * 0.3 + cell_height * 0.35 + value_font.size * 0.35
+            draw.text((value_x, baseline), measurement, font=value_font, fill=self.text_color, anchor="ls")
+            if unit:
+                draw.text((value_x + value_width + 0.002 * self.width, baseline), unit, font=unit_font, fill=self.text_color, anchor="ls")
+
+    def draw_chart(self, image, box):
+        hourly = self.params.get("hourly_forecast", [])
+        if not hourly:
+            return
+        left, top, right, bottom = box
+        font = load_font(self.font_family, max(10, 0.025 * min(self.width, self.height)))
+
+        temperatures = [hour["temperature"] for hour in hourly]
+        precipitation = [(hour.get("precipitiation") or 0) * 100 for hour in hourly]
+        min_temp, max_temp = min(temperatures), max(temperatures)
+        temp_range = (max_temp - min_temp) or 1
+
+        overlay = Image.new("RGBA", image.size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay)
+
+        # axis labels, min/max temperature on the left and precipitation on the right
+        left_labels = [f"{max_temp}°", f"{min_temp}°"]
+        plot_left = left + max(draw.textlength(label, font=font) for label in left_labels) + 4
+        plot_right = right - draw.textlength("100%", font=font) - 4
+        plot_top = top + font.size / 2
+        plot_bottom = bottom - font.size * 1.4
+        plot_width, plot_height = plot_right - plot_left, plot_bottom - plot_top
+        if plot_width <= 0 or plot_height <= 0:
+            return
+
+        draw.text((plot_left - 4, plot_top), left_labels[0], font=font, fill=self.text_color, anchor="rm")
+        draw.text((plot_left - 4, plot_bottom), left_labels[1], font=font, fill=self.text_color, anchor="rm")
+        draw.text((plot_right + 4, plot_top), "100%", font=font, fill=self.text_color, anchor="lm")
+        draw.text((plot_right + 4, plot_bottom), "0%", font=font, fill=self.text_color, anchor="lm")
+
+        slot_width = plot_width / len(hourly)
+        xs = [plot_left + slot_width * (i + 0.5) for i in range(len(hourly))]
+        ys = [plot_bottom - (t - min_temp) / temp_range * plot_height for t in temperatures]
+
+        # precipitation bars filled with a fading gradient and a solid top border
+        bar_mask = Image.new("L", image.size, 0)
+        bar_draw = ImageDraw.Draw(bar_mask)
+        for i, pct in enumerate(precipitation):
+            bar_top = plot_bottom - pct / 100 * plot_height
+            if pct > 0:
+                bar_draw.rectangle((plot_left + slot_width * i, bar_top, plot_left + slot_width * (i + 1), plot_bottom), fill=255)
+        self.composite_gradient(overlay, bar_mask, PRECIPITATION_COLOR, plot_top, plot_bottom, 0.8, 0.0)
+        for i, pct in enumerate(precipitation):
+            if pct > 0:
+                bar_top = plot_bottom - pct / 100 * plot_height
+                draw.line((plot_left + slot_width * i, bar_top, plot_left + slot_width * (i + 1), bar_top), fill=PRECIPITATION_COLOR + (255,), width=2)
+
+        # temperature area and line
+        area_mask = Image.new("L", image.size, 0)
+        ImageDraw.Draw(area_mask).polygon([(xs[0], plot_bottom)] + list(zip(xs, ys)) + [(xs[-1], plot_bottom)], fill=255)
+        self.composite_gradient(overlay, area_mask, TEMPERATURE_FILL_COLOR, plot_top, plot_bottom + 10, 0.95, 0.01)
+        draw.line(list(zip(xs, ys)), fill=TEMPERATURE_LINE_COLOR + (230,), width=2, joint="curve")
+
+        # hour labels, skipping labels that would overlap like Chart.js autoSkip
+        label_width = max(draw.textlength(str(hour["time"]), font=font) for hour in hourly) + font.size
+        step = max(1, math.ceil(label_width / slot_width))
+        for i in range(0, len(hourly), step):
+            draw.text((xs[i], bottom), str(hourly[i]["time"]), font=font, fill=self.text_color, anchor="md")
+
+        image.paste(Image.alpha_composite(image.convert("RGBA"), overlay).convert("RGB"))
+
+    def get_forecast_days(self):
+        return self.params.get("forecast", [])[1:int(self.settings.get("forecastDays") or 7) + 1]
+
+    def get_forecast_layout(self, content_width):
+        """Sizes the forecast boxes to their content, like the flex row in weather.css."""
+        days = self.get_forecast_days()
+        gap = 0.015 * self.width
+        day_width = (content_width - gap * (len(days) + 1)) / len(days)
+        padding_x, padding_y = 0.01 * self.width, 0.01 * self.height
+        name_font = load_font(self.font_family, min(0.035 * self.height, 0.035 * self.width), "bold")
+        temp_font = load_font(self.font_family, min(0.03 * self.height, 0.025 * self.width))
+        moon_height = 0.05 * self.height if self.is_enabled("moonPhase") else 0
+        icon_size = max(0, min(day_width - 2 * padding_x, 0.15 * self.height))
+        height = 2 * padding_y + name_font.size * 1.1 + icon_size + temp_font.size * 1.4 + moon_height
+        return {
+            "days": days, "gap": gap, "day_width": day_width, "padding_y": padding_y, "name_font": name_font,
+            "temp_font": temp_font, "moon_height": moon_height, "icon_size": icon_size, "height": height
+        }
+
+    def draw_forecast(self, image, draw, box):
+        left, top, right, bottom = box
+        layout = self.get_forecast_layout(right - left)
+        days, gap, day_width, padding_y = layout["days"], layout["gap"], layout["day_width"], layout["padding_y"]
+        name_font, temp_font = layout["name_font"], layout["temp_font"]
+        moon_height, icon_size = layout["moon_height"], layout["icon_size"]
+        show_moon = self.is_enabled("moonPhase")
+
+        for i, day in enumerate(days):
+            x = left + gap + i * (day_width + gap)
+            draw.rounded_rectangle((x, top, x + day_width, bottom), radius=0.012 * self.width, outline=self.text_color, width=1)
+            center_x = x + day_width / 2
+
+            y = top + padding_y
+            draw.text((center_x, y), day.get("day", ""), font=name_font, fill=self.text_color, anchor="ma")
+            y += name_font.size * 1.1
+
+            if icon_size > 0:
+                icon = load_icon(day["icon"], int(icon_size), int(icon_size))
+                image.paste(icon, (int(center_x - icon.width / 2), int(y)), icon)
+                y += icon_size
+
+            temps = f"{day.get('high', '')}{self.degree} / {day.get('low', '')}{self.degree}"
+            draw.text((center_x, y + temp_font.size * 0.2), temps, font=temp_font, fill=self.text_color, anchor="ma")
+            y += temp_font.size * 1.4
+
+            if show_moon and day.get("moon_phase_icon"):
+                draw.line((x + day_width * 0.05, y, x + day_width * 0.95, y), fill=SEPARATOR_COLOR, width=1)
+                moon_size = int(min(0.04 * self.width, moon_height * 0.8))
+                moon_icon = load_icon(day["moon_phase_icon"], moon_size, moon_size)
+                pct_text = f"{day.get('moon_phase_pct', '')} %"
+                pct_width = draw.textlength(pct_text, font=temp_font)
+                row_x = center_x - (moon_icon.width + 10 + pct_width) / 2
+                row_center = y + moon_height / 2
+                image.paste(moon_icon, (int(row_x), int(row_center - moon_icon.height / 2)), moon_icon)
+                draw.text((row_x + moon_icon.width + 10, row_center), pct_text, font=temp_font, fill=self.text_color, anchor="lm")
+
+    @staticmethod
+    def composite_gradient(overlay, mask, color, gradient_top, gradient_bottom, top_alpha, bottom_alpha):
+        """Fills the masked area of the overlay with color, fading vertically between the two alphas."""
+        span = max(1, gradient_bottom - gradient_top)
+        alpha_values = []
+        for y in range(overlay.height):
+            t = min(1, max(0, (y - gradient_top) / span))
+            alpha_values.append(int(255 * (top_alpha + (bottom_alpha - top_alpha) * t)))
+        column = Image.new("L", (1, overlay.height))
+        column.putdata(alpha_values)
+        alpha = column.resize(overlay.size, Image.NEAREST)
+        layer = Image.new("RGBA", overlay.size, color + (0,))
+        layer.putalpha(ImageChops.multiply(alpha, mask))
+        overlay.alpha_composite(layer)
+
+    def get_margin(self, key):
+        return int(self.settings.get(key) or self.settings.get("margin") or 5)
+
+    def is_enabled(self, key):
+        return self.settings.get(key) == "true"
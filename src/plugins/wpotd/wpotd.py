@@ -8,7 +8,7 @@ It supports optional manual date selection or random dates and can resize the im
 Wikipedia API Documentation: https://www.mediawiki.org/wiki/API:Main_page
 Picture of the Day example: https://www.mediawiki.org/wiki/API:Picture_of_the_day_viewer
 Github Repository: https://github.com/wikimedia/mediawiki-api-demos/tree/master/apps/picture-of-the-day-viewer
-Wikimedia requires a User Agent header for API requests, which is set in the SESSION headers:
+Wikimedia requires a User Agent header for API requests, which is set in the HEADERS:
 https://foundation.wikimedia.org/wiki/Policy:Wikimedia_Foundation_User-Agent_Policy
 
 Flow:
@@ -16,25 +16,25 @@ Flow:
 1. Fetch the date to use for the Picture of the Day (POTD) based on settings. (_determine_date)
 2. Make an API request to fetch the POTD data for that date. (_fetch_potd)
 3. Extract the image filename from the response. (_fetch_potd)
-4. Make another API request to get the image URL. (_fetch_image_src)
+4. Make another API request to get the URL of a thumbnail covering the device, a second one for wide images. (_fetch_image_src)
 5. Download the image from the URL. (_download_image)
 6. Optionally resize the image to fit the device dimensions. (_shrink_to_fit))
 """
 
 from plugins.base_plugin.base_plugin import BasePlugin
 from PIL import Image, UnidentifiedImageError
-from io import BytesIO
-import requests
+from utils.http_client import http_client
+from utils.image_utils import download_image
 import logging
+import math
 from random import randint
 from datetime import datetime, timedelta, date
 from functools import lru_cache
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 class Wpotd(BasePlugin):
-    SESSION = requests.Session()
     HEADERS = {'User-Agent': 'InkyPi/0.0 (https://github.com/fatihak/InkyPi/)'}
     API_URL = "https://en.wikipedia.org/w/api.php"
 
@@ -48,7 +48,11 @@ class Wpotd(BasePlugin):
         datetofetch = self._determine_date(settings)
         logger.info(f"WPOTD plugin datetofetch: {datetofetch}")
 
-        data = self._fetch_potd(datetofetch)
+        # the thumbnail only needs to cover the display
+        dimensions = device_config.get_resolution()
+        if device_config.get_config("orientation") == "vertical":
+            dimensions = dimensions[::-1]
+        data = self._fetch_potd(datetofetch, dimensions)
         picurl = data["image_src"]
         logger.info(f"WPOTD plugin Picture URL: {picurl}")
 
@@ -79,9 +83,7 @@ class Wpotd(BasePlugin):
                 logger.warning("SVG format is not supported by Pillow. Skipping image download.")
                 raise RuntimeError("Unsupported image format: SVG.")
 
-            response = self.SESSION.get(url, headers=self.HEADERS, timeout=10)
-            response.raise_for_status()
-            return Image.open(BytesIO(response.content))
+            return download_image(url, headers=self.HEADERS)
         except UnidentifiedImageError as e:
             logger.error(f"Unsupported image format at {url}: {str(e)}")
             raise RuntimeError("Unsupported image format.")
@@ -89,7 +91,7 @@ class Wpotd(BasePlugin):
             logger.error(f"Failed to load WPOTD image from {url}: {str(e)}")
             raise RuntimeError("Failed to load WPOTD image.")
 
-    def _fetch_potd(self, cur_date: date) -> Dict[str, Any]:
+    def _fetch_potd(self, cur_date: date, dimensions: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
         title = f"Template:POTD/{cur_date.isoformat()}"
         params = {
             "action": "query",
@@ -106,7 +108,7 @@ class Wpotd(BasePlugin):
             logger.error(f"Failed to retrieve POTD filename for {cur_date}: {e}")
             raise RuntimeError("Failed to retrieve POTD filename.")
 
-        image_src = self._fetch_image_src(filename)
+        image_src = self._fetch_image_src(filename, dimensions)
 
         return {
             "filename": filename,
@@ -115,25 +117,50 @@ class Wpotd(BasePlugin):
             "date": cur_date
         }
 
-    def _fetch_image_src(self, filename: str) -> str:
+    def _fetch_image_src(self, filename: str, dimensions: Optional[Tuple[int, int]] = None) -> str:
+        """
+        Returns the URL of the image, or of a thumbnail that covers the dimensions if given.
+        A thumbnail as wide as the longest side of the display is requested first. If the image's aspect ratio
+        needs a wider one to cover the display (e.g. a panorama), it is requested again at that width.
+        Wikimedia doesn't upscale, so smaller images are returned at their original size, and SVG images are
+        rendered to PNG thumbnails.
+        """
+        imageinfo = self._fetch_imageinfo(filename, max(dimensions) if dimensions else None)
+
+        width, height, thumb_width = imageinfo.get("width"), imageinfo.get("height"), imageinfo.get("thumbwidth")
+        if dimensions and width and height and thumb_width:
+            cover_width = math.ceil(max(dimensions[0] / width, dimensions[1] / height) * width)
+            # the original can't provide more than its own width
+            if thumb_width < cover_width and thumb_width < width:
+                imageinfo = self._fetch_imageinfo(filename, cover_width)
+
+        return imageinfo.get("thumburl") or imageinfo["url"]
+
+    def _fetch_imageinfo(self, filename: str, thumb_width: Optional[int] = None) -> Dict[str, Any]:
+        """Returns the url and size of the image, along with a thumbnail scaled to thumb_width if given."""
         params = {
             "action": "query",
             "format": "json",
             "prop": "imageinfo",
-            "iiprop": "url",
+            "iiprop": "url|size",
             "titles": filename
         }
+        if thumb_width:
+            params["iiurlwidth"] = thumb_width
         data = self._make_request(params)
         try:
             page = next(iter(data["query"]["pages"].values()))
-            return page["imageinfo"][0]["url"]
+            imageinfo = page["imageinfo"][0]
+            if "url" not in imageinfo:
+                raise KeyError("url")
         except (KeyError, IndexError, StopIteration) as e:
             logger.error(f"Failed to retrieve image URL for {filename}: {e}")
             raise RuntimeError("Failed to retrieve image URL.")
+        return imageinfo
 
     def _make_request(self, params: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            response = self.SESSION.get(self.API_URL, params=params, headers=self.HEADERS, timeout=10)
+            response = http_client.get(self.API_URL, params=params, headers=self.HEADERS, timeout=10)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -1,10 +1,16 @@
 import threading
+import itertools
+import copy
 import time
 import os
+import json
+import uuid
 import logging
+from collections import deque, OrderedDict
 import psutil
 import pytz
-from datetime import datetime, timezone
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone, timedelta
 from plugins.plugin_registry import get_plugin_instance
 from utils.image_utils import compute_image_hash
 from model import RefreshInfo, PlaylistManager
@@ -12,6 +18,21 @@ from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+# How long before the next playlist slot the upcoming plugin instance is rendered
+DEFAULT_PRERENDER_LEAD_SECONDS = 120
+
+# Number of plugin images that can be generated concurrently for manual and playlist refreshes
+DEFAULT_PLUGIN_WORKERS = 2
+
+# How long a plugin may take to generate an image, plugins can override it with `timeout_seconds` in plugin-info.json
+DEFAULT_PLUGIN_TIMEOUT_SECONDS = 120
+
+# Number of finished manual update jobs kept around for status lookups
+MAX_TRACKED_JOBS = 50
+
+# How many minutes ahead the frames of upcoming refreshes are precomputed for plugin instances that support it
+DEFAULT_PRECOMPUTE_MINUTES = 60
+
 class RefreshTask:
     """Handles the logic for refreshing the display using a backgroud thread."""
 
@@ -23,11 +44,37 @@ class RefreshTask:
         self.lock = threading.Lock()
         self.condition = threading.Condition(self.lock)
         self.running = False
-        self.manual_update_request = ()
 
-        self.refresh_event = threading.Event()
-        self.refresh_event.set()
-        self.refresh_result = {}
+        # pending manual refresh jobs, the lock only guards this queue, the job registry, the renders in flight
+        # and the running flag
+        self.refresh_queue = deque()
+        self.jobs = OrderedDict()
+
+        # plugin images are generated on worker pools, finished renders are handed back to the refresh thread
+        # which does the display writes in order
+        self.rendering = set()
+        self.rendered = deque()
+        self.render_ids = itertools.count()
+        self.displayed_render_id = -1
+        self.playlist_render_pending = False
+
+        # refreshes requested by the user or the playlist get their own pool, so background renders never delay them.
+        # Plugin objects are shared instances, the pools run one job per plugin at a time between them
+        max_workers = self.device_config.get_config("plugin_workers", default=DEFAULT_PLUGIN_WORKERS)
+        self.busy_plugins = BusyPlugins()
+        self.render_pool = PluginWorkerPool(max_workers, "plugin-worker", self.busy_plugins)
+        self.prerender_pool = PluginWorkerPool(1, "plugin-prerender", self.busy_plugins)
+
+        # look-ahead rendering of the next playlist item
+        self.prerender_timer = None
+        self.prerender_slot = None
+        self.prerender_lock = threading.Lock()
+        self.prerendered = None
+
+        # idle time precomputation of upcoming frames, see `_schedule_precompute()`, runs on its own worker so
+        # the batch never delays a prerender
+        self.precompute_pool = PluginWorkerPool(1, "plugin-precompute", self.busy_plugins)
+        self.precompute_futures = []
 
     def start(self):
         """Starts the background thread for refreshing the display."""
@@ -42,30 +89,45 @@ class RefreshTask:
         with self.condition:
             self.running = False
             self.condition.notify_all()  # Wake the thread to let it exit
+        self._cancel_prerender()
         if self.thread:
             logger.info("Stopping refresh task")
             self.thread.join()
+        self.render_pool.shutdown()
+        self.prerender_pool.shutdown()
+        self.precompute_pool.shutdown()
+
+        # release callers still waiting on requests that will never be processed
+        with self.condition:
+            pending_jobs = [job for job in self.refresh_queue]
+            pending_jobs += [render.job for render in self.rendered if render.job]
+            self.refresh_queue.clear()
+            self.rendered.clear()
+        for job in pending_jobs:
+            job.fail(RuntimeError("Refresh task stopped before the update was processed."))
 
     def _run(self):
         """Background task that manages the periodic refresh of the display.
 
         This function runs in a loop, sleeping for a configured duration (`plugin_cycle_interval_seconds`) or until
-        manually triggered via `manual_update()`. Detrmines the next plugin to refresh based on active playlists and 
+        manually triggered via `submit_update()`. Detrmines the next plugin to refresh based on active playlists and 
         updates the display accordingly.
 
         Workflow:
-        1. Waits for the configured sleep duration or until notified of a manual update.
-        2. Checks if a manual update has been requested:
-        - If so, refreshes the specified plugin immediately.
-        3. Otherwise, determines the next plugin to refresh based on the active playlist and generates an image.
-        4. Compares the image hash with the last displayed image hash.
-        - If the image has changed, updates the display.
-        - If the image is the same, skips the refresh.
-        5. Updates the refresh metadata in the device configuration.
-        6. Repeats the process until `stop()` is called.
-
-        Handles any exceptions that occur during the refresh process and ensures the refresh event is set 
-        to indicate completion.
+        1. Waits until the next refresh is due (`plugin_cycle_interval_seconds` after the latest one), until notified of a manual update or until a render finishes.
+        2. Checks if a render has finished:
+        - If so, compares the hash of the display-resolution, palette-quantized frame with the last displayed hash
+        and updates the display if the image has changed, unless a newer refresh was displayed in the meantime.
+        - Updates the refresh metadata in the device configuration.
+        3. Otherwise checks if a manual update has been queued:
+        - If so, submits it to the worker pool right away, without waiting for renders already in progress.
+        4. Otherwise, determines the next plugin to refresh based on the active playlist and submits its render,
+        using the image pre-rendered ahead of the slot by `_prerender()` if available.
+        5. Repeats the process until `stop()` is called.
+
+        The lock is only held while taking work off the queues, so `submit_update()`, `signal_config_change()`
+        and `stop()` never wait for a render or a panel update. Images are generated on the worker pools and only
+        the display writes happen on this thread.
 
         Exceptions:
         - Captures and logs any unexpected errors during execution to prevent the thread from exiting.
@@ -73,81 +135,254 @@ class RefreshTask:
         while True:
             try:
                 with self.condition:
-                    sleep_time = self.device_config.get_config("plugin_cycle_interval_seconds", default=60*60)
-
-                    # Wait for sleep_time or until notified
-                    self.condition.wait(timeout=sleep_time)
-                    self.refresh_result = {}
-                    self.refresh_event.clear()
-
-                    # Exit if `stop()` is called
+                    # `stop()` may have been called during the last refresh, its notification is gone by now
                     if not self.running:
                         break
 
-                    playlist_manager = self.device_config.get_playlist_manager()
-                    latest_refresh = self.device_config.get_refresh_info()
-                    current_dt = self._get_current_datetime()
-
-                    refresh_action = None
-                    if self.manual_update_request:
-                        # handle immediate update request
-                        logger.info("Manual update requested")
-                        refresh_action = self.manual_update_request
-                        self.manual_update_request = ()
-                    else:
-
-                        if self.device_config.get_config("log_system_stats"):
-                            self.log_system_stats()
-
-                        # handle refresh based on playlists
-                        logger.info(f"Running interval refresh check. | current_time: {current_dt.strftime('%Y-%m-%d %H:%M:%S')}")
-                        playlist, plugin_instance = self._determine_next_plugin(playlist_manager, latest_refresh, current_dt)
-                        if plugin_instance:
-                            refresh_action = PlaylistRefresh(playlist, plugin_instance)
-
-                    if refresh_action:
-                        plugin_config = self.device_config.get_plugin(refresh_action.get_plugin_id())
-                        if plugin_config is None:
-                            logger.error(f"Plugin config not found for '{refresh_action.get_plugin_id()}'.")
-                            continue
-                        plugin = get_plugin_instance(plugin_config)
-                        image = refresh_action.execute(plugin, self.device_config, current_dt)
-                        image_hash = compute_image_hash(image)
-
-                        refresh_info = refresh_action.get_refresh_info()
-                        refresh_info.update({"refresh_time": current_dt.isoformat(), "image_hash": image_hash})
-                        # check if image is the same as current image
-                        if image_hash != latest_refresh.image_hash:
-                            logger.info(f"Updating display. | refresh_info: {refresh_info}")
-                            self.display_manager.display_image(image, image_settings=plugin.config.get("image_settings", []))
-                        else:
-                            logger.info(f"Image already displayed, skipping refresh. | refresh_info: {refresh_info}")
-
-                        # update latest refresh data in the device config
-                        self.device_config.refresh_info = RefreshInfo(**refresh_info)
-                        self.device_config.write_config()
+                    if not self.rendered and not self._has_dispatchable_job():
+                        interval = self.device_config.get_config("plugin_cycle_interval_seconds", default=60*60)
+                        next_refresh_dt = self._get_next_refresh_datetime(interval)
+                        self._schedule_prerender(next_refresh_dt, interval)
 
-            except Exception as e:
+                        # Wait until the next refresh is due or until notified
+                        sleep_time = (next_refresh_dt - self._get_current_datetime()).total_seconds()
+                        self.condition.wait(timeout=max(sleep_time, 0))
+
+                        # Exit if `stop()` is called
+                        if not self.running:
+                            break
+
+                    render = self.rendered.popleft() if self.rendered else None
+                    job = self._pop_dispatchable_job() if not render else None
+                    playlist_render_pending = self.playlist_render_pending
+
+                if render:
+                    self._display_render(render)
+                elif job:
+                    # handle immediate update request
+                    logger.info(f"Manual update requested. | job_id: {job.job_id}")
+                    self._dispatch(job.refresh_action, self._get_current_datetime(), job)
+                elif not playlist_render_pending:
+                    self._refresh_playlist()
+
+            except Exception:
                 logger.exception('Exception during refresh')
-                self.refresh_result["exception"] = e  # Capture exception
-            finally:
-                self.refresh_event.set()
 
-    def manual_update(self, refresh_action):
-        """Manually triggers an update for the specified plugin id and plugin settings by notifying the background process."""
-        if self.running:
+    def _refresh_playlist(self):
+        """Refreshes the display with the next plugin of the active playlist if it's time to."""
+        playlist_manager = self.device_config.get_playlist_manager()
+        latest_refresh = self.device_config.get_refresh_info()
+        current_dt = self._get_current_datetime()
+
+        if self.device_config.get_config("log_system_stats"):
+            self.log_system_stats()
+
+        # handle refresh based on playlists
+        logger.info(f"Running interval refresh check. | current_time: {current_dt.strftime('%Y-%m-%d %H:%M:%S')}")
+        playlist, plugin_instance = self._determine_next_plugin(playlist_manager, latest_refresh, current_dt)
+        if plugin_instance:
+            precomputed = self._take_precomputed(plugin_instance, current_dt)
+            if precomputed:
+                self._refresh_precomputed(PlaylistRefresh(playlist, plugin_instance), precomputed, current_dt)
+            else:
+                prerendered = self._take_prerendered(playlist, plugin_instance)
+                self._dispatch(PlaylistRefresh(playlist, plugin_instance, prerendered=prerendered), current_dt)
+            self._schedule_precompute(playlist, current_dt)
+
+    def _dispatch(self, refresh_action, current_dt, job=None):
+        """Submits generation of the refresh action's image to the worker pool without waiting for it.
+
+        The finished render is queued for the refresh thread, which displays it in `_display_render()`. If a job
+        is given, its status is advanced as the refresh moves through its stages.
+        """
+        plugin_config = self.device_config.get_plugin(refresh_action.get_plugin_id())
+        if plugin_config is None:
+            logger.error(f"Plugin config not found for '{refresh_action.get_plugin_id()}'.")
+            if job:
+                job.fail(RuntimeError(f"Plugin config not found for '{refresh_action.get_plugin_id()}'."))
+            return
+        plugin = get_plugin_instance(plugin_config)
+
+        render = RefreshRender(next(self.render_ids), refresh_action, current_dt, job)
+        with self.condition:
+            self.rendering.add(refresh_action.get_refresh_key())
+            if job is None:
+                self.playlist_render_pending = True
+
+        timeout = self._get_plugin_timeout(plugin.config)
+        try:
+            future = self.render_pool.submit(self._render, refresh_action, plugin, current_dt, job,
+                                             plugin_id=plugin.get_plugin_id(), timeout=timeout)
+        except Exception as e:
+            self._release_target(refresh_action)
+            self._render_done(render, plugin, timeout, None, e)
+            return
+        future.add_done_callback(lambda f: self._render_done(render, plugin, timeout, f))
+
+    def _render(self, refresh_action, plugin, current_dt, job):
+        """Generates the refresh action's image and the frame it shows on the panel, runs on the worker pool."""
+        try:
+            if job:
+                job.set_status(RefreshJob.RENDERING)
+            image = refresh_action.execute(plugin, self.device_config, current_dt)
+            image_settings = plugin.config.get("image_settings", [])
+
+            # hash the frame as the panel would show it, so invisible differences don't trigger a refresh
+            frame = self.display_manager.process_image(image, image_settings)
+            image_hash = compute_image_hash(frame, self.display_manager.get_palette())
+            return image, image_settings, frame, image_hash
+        finally:
+            # a render abandoned after its timeout keeps its target until the thread actually exits
+            self._release_target(refresh_action)
+
+    def _release_target(self, refresh_action):
+        """Allows queued jobs for the refresh action's target to be dispatched again."""
+        with self.condition:
+            self.rendering.discard(refresh_action.get_refresh_key())
+            self.condition.notify_all()  # Wake the thread to dispatch waiting jobs
+
+    def _render_done(self, render, plugin, timeout, future, error=None):
+        """Hands a finished render back to the refresh thread."""
+        if future is not None:
+            try:
+                render.image, render.image_settings, render.frame, render.image_hash = future.result()
+            except FutureTimeoutError:
+                error = RuntimeError(f"Plugin '{plugin.get_plugin_id()}' did not finish within {timeout} seconds.")
+            except Exception as e:
+                error = e
+        render.error = error
+
+        with self.condition:
+            if self.running:
+                self.rendered.append(render)
+                self.condition.notify_all()  # Wake the thread to display the image
+                return
+        if render.job:
+            render.job.fail(RuntimeError("Refresh task stopped before the update was processed."))
+
+    def _display_render(self, render):
+        """Updates the display with a finished render if the frame changed, runs on the refresh thread."""
+        job = render.job
+        if job is None:
             with self.condition:
-                self.manual_update_request = refresh_action
-                self.refresh_result = {}
-                self.refresh_event.clear()
+                self.playlist_render_pending = False
+
+        if render.error:
+            logger.error(f"Failed to generate image. | plugin_id: {render.refresh_action.get_plugin_id()} | error: {render.error}")
+            if job:
+                job.fail(render.error)  # Capture exception for the caller
+            return
 
-                self.condition.notify_all()  # Wake the thread to process manual update
+        try:
+            # renders that failed or timed out never get here, an abandoned render can't change the playlist
+            render.refresh_action.complete(render.image, self.device_config, render.current_dt)
 
-            self.refresh_event.wait()
-            if self.refresh_result.get("exception"):
-                raise self.refresh_result.get("exception")
+            refresh_info = render.refresh_action.get_refresh_info()
+            refresh_info.update({"refresh_time": render.current_dt.isoformat(), "image_hash": render.image_hash})
+
+            # renders finish out of order, a slow render must not replace a refresh requested after it
+            if render.render_id < self.displayed_render_id:
+                logger.info(f"Newer refresh already displayed, skipping refresh. | refresh_info: {refresh_info}")
+                if job:
+                    job.set_status(RefreshJob.DONE)
+                return
+
+            latest_refresh = self.device_config.get_refresh_info()
+            # check if image is the same as current image
+            if render.image_hash != latest_refresh.image_hash:
+                logger.info(f"Updating display. | refresh_info: {refresh_info}")
+                if job:
+                    job.set_status(RefreshJob.DISPLAYING)
+                self.display_manager.display_image(render.image, image_settings=render.image_settings, frame=render.frame)
+            else:
+                logger.info(f"Image already displayed, skipping refresh. | refresh_info: {refresh_info}")
+            self.displayed_render_id = render.render_id
+
+            # update latest refresh data in the device config
+            self.device_config.refresh_info = RefreshInfo(**refresh_info)
+            self.device_config.write_config()
+        except Exception as e:
+            if job:
+                job.fail(e)  # Capture exception for the caller
+            raise
+
+        if job:
+            job.set_status(RefreshJob.DONE)
+
+    def _refresh_precomputed(self, refresh_action, precomputed, current_dt):
+        """Displays a precomputed frame for the playlist refresh, the hot path is a hash comparison and a buffer write."""
+        latest_refresh = self.device_config.get_refresh_info()
+        refresh_action.execute_precomputed(precomputed, self.device_config, current_dt)
+
+        refresh_info = refresh_action.get_refresh_info()
+        refresh_info.update({"refresh_time": current_dt.isoformat(), "image_hash": precomputed.image_hash})
+        if precomputed.image_hash != latest_refresh.image_hash:
+            logger.info(f"Updating display with precomputed frame. | refresh_info: {refresh_info}")
+            self.display_manager.display_precomputed(precomputed)
         else:
+            logger.info(f"Image already displayed, skipping refresh. | refresh_info: {refresh_info}")
+        self.displayed_render_id = next(self.render_ids)
+
+        self.device_config.refresh_info = RefreshInfo(**refresh_info)
+        self.device_config.write_config()
+
+    def submit_update(self, refresh_action):
+        """Queues a manual update for the background process and returns its RefreshJob without waiting for it.
+
+        A request for the same target as a pending job is merged into that job and the pending job is returned.
+
+        Raises:
+            RuntimeError: If the background refresh task is not running.
+        """
+        if not self.running:
             logger.warn("Background refresh task is not running, unable to do a manual update")
+            raise RuntimeError("Background refresh task is not running.")
+        return self._enqueue(refresh_action)
+
+    def get_job(self, job_id):
+        """Returns the RefreshJob with the given id, or None if it's unknown or no longer tracked."""
+        with self.condition:
+            return self.jobs.get(job_id)
+
+    def _enqueue(self, refresh_action):
+        """Adds the refresh action to the queue, merging it into a pending job for the same target."""
+        with self.condition:
+            refresh_key = refresh_action.get_refresh_key()
+            job = next((j for j in self.refresh_queue if j.refresh_action.get_refresh_key() == refresh_key), None)
+            if job:
+                # the newest request wins, callers waiting on the pending job get its result
+                logger.info(f"Coalescing manual update with pending job. | job_id: {job.job_id} | refresh_key: {refresh_key}")
+                job.refresh_action = refresh_action
+            else:
+                job = RefreshJob(refresh_action)
+                self.refresh_queue.append(job)
+                self.jobs[job.job_id] = job
+                # forget the oldest finished jobs, unfinished ones are still being polled
+                excess = len(self.jobs) - MAX_TRACKED_JOBS
+                if excess > 0:
+                    finished = [job_id for job_id, tracked in self.jobs.items() if tracked.done.is_set()]
+                    for job_id in finished[:excess]:
+                        del self.jobs[job_id]
+
+            self.condition.notify_all()  # Wake the thread to process manual update
+        return job
+
+    def _has_dispatchable_job(self):
+        """Checks whether a queued job can be dispatched, must be called with the lock held."""
+        return any(job.refresh_action.get_refresh_key() not in self.rendering for job in self.refresh_queue)
+
+    def _pop_dispatchable_job(self):
+        """Removes and returns the oldest queued job whose target isn't rendering already, must be called with the lock held.
+
+        A repeated request for a target waits in the queue until the thread of its previous render exits, newer
+        requests for it are coalesced meanwhile. Renders of the same plugin for different targets are serialized by
+        the worker pools, see `BusyPlugins`.
+        """
+        for job in self.refresh_queue:
+            if job.refresh_action.get_refresh_key() not in self.rendering:
+                self.refresh_queue.remove(job)
+                return job
+        return None
 
     def signal_config_change(self):
         """Notify the background thread that config has changed (e.g., interval updated)."""
@@ -155,6 +390,199 @@ class RefreshTask:
             with self.condition:
                 self.condition.notify_all()
 
+    def _get_next_refresh_datetime(self, interval):
+        """Returns when the next playlist refresh is due, the interval after the latest refresh."""
+        current_dt = self._get_current_datetime()
+        latest_refresh_dt = self.device_config.get_refresh_info().get_refresh_datetime()
+        if latest_refresh_dt:
+            next_refresh_dt = latest_refresh_dt + timedelta(seconds=interval)
+            if next_refresh_dt > current_dt:
+                return next_refresh_dt
+        # due already, e.g. no playlist was active at the last check
+        return current_dt + timedelta(seconds=interval)
+
+    def _schedule_prerender(self, slot_dt, interval):
+        """Schedules rendering of the next playlist item shortly before the refresh slot at slot_dt.
+
+        Nothing changes while the slot and the plugin instance expected in it stay the same, so waking the refresh
+        thread doesn't restart a scheduled or running prerender.
+        """
+        lead_seconds = self.device_config.get_config("prerender_lead_seconds", default=DEFAULT_PRERENDER_LEAD_SECONDS)
+        if not lead_seconds:
+            return
+
+        playlist = self.device_config.get_playlist_manager().determine_active_playlist(slot_dt)
+        plugin_instance = playlist.peek_next_plugin() if playlist else None
+        slot = (slot_dt, playlist.name, plugin_instance.plugin_id, plugin_instance.name) if plugin_instance else None
+        if slot == self.prerender_slot:
+            return
+        self._cancel_prerender()
+        self.prerender_slot = slot
+        if not slot:
+            return
+
+        # leave at least half the interval so the prerender reflects fresh data
+        lead_seconds = min(lead_seconds, interval / 2)
+        delay = max((slot_dt - self._get_current_datetime()).total_seconds() - lead_seconds, 0)
+        self.prerender_timer = threading.Timer(delay, self._prerender, args=(slot_dt, lead_seconds))
+        self.prerender_timer.daemon = True
+        self.prerender_timer.start()
+
+    def _cancel_prerender(self):
+        """Cancels a scheduled prerender that hasn't started yet."""
+        if self.prerender_timer:
+            self.prerender_timer.cancel()
+            self.prerender_timer = None
+
+    def _prerender(self, slot_dt, lead_seconds):
+        """Submits generation of the plugin instance expected at the slot to the prerender pool, so only the display write remains."""
+        if not self.running:
+            return
+        try:
+            playlist = self.device_config.get_playlist_manager().determine_active_playlist(slot_dt)
+            if not playlist:
+                return
+            plugin_instance = playlist.peek_next_plugin()
+            if not plugin_instance or not plugin_instance.should_refresh(slot_dt):
+                return
+
+            plugin_config = self.device_config.get_plugin(plugin_instance.plugin_id)
+            if plugin_config is None:
+                return
+
+            plugin = get_plugin_instance(plugin_config)
+            if self._get_precomputed(plugin, plugin_instance, slot_dt):
+                return
+
+            # snapshot the settings before rendering, so edits made while the image renders are detected
+            prerendered = PrerenderedImage(playlist.name, plugin_instance, slot_dt, lead_seconds)
+            prerendered.settings = PrerenderedImage.snapshot_settings(plugin_instance.settings)
+            prerendered.plugin_settings = copy.deepcopy(plugin_instance.settings)
+
+            def generate():
+                logger.info(f"Prerendering next plugin instance. | playlist: {playlist.name} | plugin_instance: {plugin_instance.name}")
+                return plugin.generate_image(prerendered.plugin_settings, self.device_config)
+
+            prerendered.future = self.prerender_pool.submit(generate, plugin_id=plugin_instance.plugin_id,
+                                                            timeout=self._get_plugin_timeout(plugin_config))
+            with self.prerender_lock:
+                self.prerendered = prerendered
+        except Exception:
+            logger.exception("Failed to prerender next plugin instance")
+
+    def _take_prerendered(self, playlist, plugin_instance):
+        """Returns the prerender of the plugin instance if there is one, see `PrerenderedImage.get_image()`."""
+        with self.prerender_lock:
+            prerendered = self.prerendered
+            self.prerendered = None
+
+        if not prerendered or not prerendered.matches(playlist, plugin_instance):
+            return None
+        if not prerendered.is_current(self._get_current_datetime()):
+            logger.info(f"Prerender was for another slot, discarding. | plugin_instance: {plugin_instance.name}")
+            prerendered.future.cancel()
+            return None
+        return prerendered
+
+    def _schedule_precompute(self, playlist, current_dt):
+        """Submits precomputation of the frames shown at the upcoming refresh slots to the precompute pool.
+
+        The refresh at current_dt becomes the latest one, so the next slots follow it by multiples of the plugin
+        cycle interval (see `_get_next_refresh_datetime()`) and each one shows the next plugin instance of the
+        playlist. Only slots within `precompute_minutes` whose plugin instance returns a frame key are precomputed,
+        and a new batch is only scheduled once the last one finished. Every frame is its own job, so a refresh of the
+        plugin only waits for the frame being rendered.
+        """
+        precompute_minutes = self.device_config.get_config("precompute_minutes", default=DEFAULT_PRECOMPUTE_MINUTES)
+        if not precompute_minutes or not playlist.plugins or not all(future.done() for future in self.precompute_futures):
+            return
+
+        interval = self.device_config.get_config("plugin_cycle_interval_seconds", default=60*60)
+        slot_count = int(precompute_minutes * 60 // interval) if interval else 0
+        plugin_index = playlist.current_plugin_index or 0
+        futures = []
+        for slot in range(1, slot_count + 1):
+            plugin_instance = playlist.plugins[(plugin_index + slot) % len(playlist.plugins)]
+            plugin_config = self.device_config.get_plugin(plugin_instance.plugin_id)
+            if plugin_config is None:
+                continue
+            plugin = get_plugin_instance(plugin_config)
+            # frames are rendered at the start of the minute of their slot, see `BasePlugin.get_frame_key()`
+            frame_dt = (current_dt + timedelta(seconds=slot * interval)).replace(second=0, microsecond=0)
+            if self._get_precompute_key(plugin, plugin_instance, frame_dt) is None:
+                continue
+            futures.append(self.precompute_pool.submit(self._precompute, plugin, plugin_instance, frame_dt,
+                                                       plugin_id=plugin_instance.plugin_id))
+        self.precompute_futures = futures
+
+    def _precompute(self, plugin, plugin_instance, frame_dt):
+        """Renders and stores the frame of the plugin instance at frame_dt unless it's precomputed already."""
+        if not self.running:
+            return
+        try:
+            key = self._get_precompute_key(plugin, plugin_instance, frame_dt)
+            if key is None or self.display_manager.get_precomputed_frame(key):
+                return
+
+            image = plugin.generate_image_at(plugin_instance.settings, self.device_config, frame_dt)
+            precomputed = self.display_manager.precompute_frame(image, plugin.config.get("image_settings", []))
+            if precomputed is None:
+                logger.info("Display doesn't support precomputed frames, skipping precomputation.")
+                for future in self.precompute_futures:
+                    future.cancel()
+                return
+            if not self.display_manager.add_precomputed_frame(key, precomputed):
+                # the stored frames are due sooner, the rest is precomputed once they've been shown
+                logger.info("Precomputed frame cache is full, precomputing the remaining frames later.")
+                for future in self.precompute_futures:
+                    future.cancel()
+            logger.debug(f"Precomputed frame. | plugin_instance: {plugin_instance.name} | frame_time: {frame_dt.isoformat()}")
+        except Exception:
+            logger.exception("Failed to precompute frame")
+
+    def _take_precomputed(self, plugin_instance, current_dt):
+        """Removes and returns the precomputed frame for the plugin instance at the current time if it's due for a refresh.
+
+        A frame is only shown once, taking it out of the cache leaves room for the frames of later slots.
+        """
+        if not plugin_instance.should_refresh(current_dt):
+            return None
+        plugin_config = self.device_config.get_plugin(plugin_instance.plugin_id)
+        if plugin_config is None:
+            return None
+        key = self._get_precompute_key(get_plugin_instance(plugin_config), plugin_instance, current_dt)
+        if key is None:
+            return None
+        return self.display_manager.pop_precomputed_frame(key)
+
+    def _get_precomputed(self, plugin, plugin_instance, dt):
+        """Returns the precomputed frame of the plugin instance at dt, or None."""
+        key = self._get_precompute_key(plugin, plugin_instance, dt)
+        if key is None:
+            return None
+        return self.display_manager.get_precomputed_frame(key)
+
+    def _get_precompute_key(self, plugin, plugin_instance, dt):
+        """Returns the key of the plugin instance's frame at dt, covering its settings and the display settings, or None."""
+        frame_key = plugin.get_frame_key(plugin_instance.settings, self.device_config, dt)
+        if frame_key is None:
+            return None
+
+        display_settings = [
+            plugin.config.get("image_settings", []),
+            self.device_config.get_resolution(),
+            self.device_config.get_config("orientation"),
+            self.device_config.get_config("inverted_image"),
+            self.device_config.get_config("image_settings")
+        ]
+        settings = PrerenderedImage.snapshot_settings([plugin_instance.settings, display_settings])
+        return (plugin_instance.plugin_id, plugin_instance.name, frame_key, settings)
+
+    def _get_plugin_timeout(self, plugin_config):
+        """Returns the generation timeout in seconds for the plugin."""
+        default_timeout = self.device_config.get_config("plugin_timeout_seconds", default=DEFAULT_PLUGIN_TIMEOUT_SECONDS)
+        return plugin_config.get("timeout_seconds", default_timeout)
+
     def _get_current_datetime(self):
         """Retrieves the current datetime based on the device's configured timezone."""
         tz_str = self.device_config.get_config("timezone", default="UTC")
@@ -217,6 +645,14 @@ class RefreshAction:
         """Return the plugin ID associated with this refresh."""
         raise NotImplementedError("Subclasses must implement the get_plugin_id method.")
 
+    def get_refresh_key(self):
+        """Return a key identifying what is refreshed, pending actions with the same key are coalesced."""
+        raise NotImplementedError("Subclasses must implement the get_refresh_key method.")
+
+    def complete(self, image, device_config, current_dt):
+        """Record a generated image once the refresh thread accepted it, nothing is recorded by default."""
+        pass
+
 class ManualRefresh(RefreshAction):
     """Performs a manual refresh based on a plugin's ID and its associated settings.
     
@@ -241,18 +677,28 @@ class ManualRefresh(RefreshAction):
         """Return the plugin ID associated with this refresh."""
         return self.plugin_id
 
+    def get_refresh_key(self):
+        """Return a key identifying what is refreshed, pending actions with the same key are coalesced."""
+        return ("manual", self.plugin_id)
+
 class PlaylistRefresh(RefreshAction):
     """Performs a refresh using a plugin instance within a playlist context.
 
     Attributes:
         playlist: The playlist object associated with the refresh.
         plugin_instance: The plugin instance to refresh.
+        force (bool): Refresh even if the plugin instance isn't due.
+        prerendered (PrerenderedImage): Image generated ahead of time for this refresh, used instead of generating one.
     """
 
-    def __init__(self, playlist, plugin_instance, force=False):
+    def __init__(self, playlist, plugin_instance, force=False, prerendered=None):
         self.playlist = playlist
         self.plugin_instance = plugin_instance
         self.force = force
+        self.prerendered = prerendered
+        # set by `execute()` on the worker pool, applied to the plugin instance by `complete()`
+        self.refreshed = False
+        self.prerendered_settings = None
 
     def get_refresh_info(self):
         """Return refresh metadata as a dictionary."""
@@ -267,22 +713,343 @@ class PlaylistRefresh(RefreshAction):
         """Return the plugin ID associated with this refresh."""
         return self.plugin_instance.plugin_id
 
+    def get_refresh_key(self):
+        """Return a key identifying what is refreshed, pending actions with the same key are coalesced."""
+        return ("playlist", self.playlist.name, self.plugin_instance.plugin_id, self.plugin_instance.name)
+
     def execute(self, plugin, device_config, current_dt: datetime):
-        """Performs a refresh for the specified plugin instance within its playlist context."""
+        """Performs a refresh for the specified plugin instance within its playlist context.
+
+        Runs on the worker pool, the new image is stored by `complete()` once the refresh thread accepts it.
+        """
         # Determine the file path for the plugin's image
         plugin_image_path = os.path.join(device_config.plugin_image_dir, self.plugin_instance.get_image_path())
 
         # Check if a refresh is needed based on the plugin instance's criteria
         if self.plugin_instance.should_refresh(current_dt) or self.force:
             logger.info(f"Refreshing plugin instance. | plugin_instance: '{self.plugin_instance.name}'") 
-            # Generate a new image
-            image = plugin.generate_image(self.plugin_instance.settings, device_config)
-            image.save(plugin_image_path)
-            self.plugin_instance.latest_refresh_time = current_dt.isoformat()
+            # Generate a new image, unless it was already rendered ahead of the slot
+            image = self.prerendered.get_image(self.plugin_instance) if self.prerendered else None
+            if image is None:
+                image = plugin.generate_image(self.plugin_instance.settings, device_config)
+            else:
+                self.prerendered_settings = self.prerendered.plugin_settings
+            self.refreshed = True
         else:
             logger.info(f"Not time to refresh plugin instance, using latest image. | plugin_instance: {self.plugin_instance.name}.")
             # Load the existing image from disk
             with Image.open(plugin_image_path) as img:
                 image = img.copy()
 
-        return image
\ No newline at end of file
+        return image
+
+    def complete(self, image, device_config, current_dt):
+        """Stores a newly generated image as the latest one of the plugin instance, runs on the refresh thread."""
+        if not self.refreshed:
+            return
+        if self.prerendered_settings is not None:
+            # keep what the plugin stored in its settings during the prerender, as if it had rendered now
+            self.plugin_instance.settings.update(self.prerendered_settings)
+        plugin_image_path = os.path.join(device_config.plugin_image_dir, self.plugin_instance.get_image_path())
+        image.save(plugin_image_path)
+        self.plugin_instance.latest_refresh_time = current_dt.isoformat()
+
+    def execute_precomputed(self, precomputed, device_config, current_dt: datetime):
+        """Records a refresh of the plugin instance served from a precomputed frame, storing its image as the latest one."""
+        plugin_image_path = os.path.join(device_config.plugin_image_dir, self.plugin_instance.get_image_path())
+        logger.info(f"Refreshing plugin instance from precomputed frame. | plugin_instance: '{self.plugin_instance.name}'")
+        with open(plugin_image_path, "wb") as f:
+            f.write(precomputed.image_data)
+        self.plugin_instance.latest_refresh_time = current_dt.isoformat()
+
+class RefreshJob:
+    """A manual refresh queued on the RefreshTask, tracked by id so clients can poll its progress.
+
+    Attributes:
+        job_id (str): Unique id of the job.
+        refresh_action (RefreshAction): The action to perform, replaced when a newer request is coalesced into the job.
+        status (str): One of 'queued', 'rendering', 'displaying', 'done' or 'error'.
+        stage_times (dict): Epoch time each status was entered.
+        error (str): Error message if the job failed.
+        exception (Exception): Exception raised while processing the job.
+        done (threading.Event): Set once the job has finished, successfully or not.
+    """
+
+    QUEUED = "queued"
+    RENDERING = "rendering"
+    DISPLAYING = "displaying"
+    DONE = "done"
+    ERROR = "error"
+    STAGES = (QUEUED, RENDERING, DISPLAYING, DONE, ERROR)
+
+    def __init__(self, refresh_action):
+        self.job_id = uuid.uuid4().hex
+        self.refresh_action = refresh_action
+        self.status = None
+        self.stage_times = {}
+        self.error = None
+        self.exception = None
+        self.done = threading.Event()
+        self.set_status(RefreshJob.QUEUED)
+
+    def set_status(self, status):
+        """Moves the job to the given stage, recording when it was entered."""
+        self.status = status
+        self.stage_times[status] = time.time()
+        if status in (RefreshJob.DONE, RefreshJob.ERROR):
+            self.done.set()
+
+    def fail(self, exception):
+        """Marks the job as failed with the given exception."""
+        self.exception = exception
+        self.error = str(exception)
+        self.set_status(RefreshJob.ERROR)
+
+    def to_dict(self):
+        """Returns the job status along with the seconds spent in each completed stage."""
+        stages = [stage for stage in RefreshJob.STAGES if stage in self.stage_times]
+        durations = {
+            stage: round(self.stage_times[next_stage] - self.stage_times[stage], 3)
+            for stage, next_stage in zip(stages, stages[1:])
+        }
+
+        job = {
+            "job_id": self.job_id,
+            "status": self.status,
+            "plugin_id": self.refresh_action.get_plugin_id(),
+            "stage_times": dict(self.stage_times),
+            "stage_durations": durations
+        }
+        if self.error:
+            job["error"] = self.error
+        return job
+
+class PrerenderedImage:
+    """An image rendered ahead of its playlist slot.
+
+    Attributes:
+        playlist_name (str): Name of the playlist the plugin instance belongs to.
+        plugin_id (str): Plugin id of the plugin instance.
+        instance_name (str): Name of the plugin instance.
+        slot_dt (datetime): Time of the playlist slot the image was rendered for.
+        lead_seconds (float): How long ahead of the slot the image was rendered.
+        future (concurrent.futures.Future): Resolves to the generated image.
+        settings (str): Snapshot of the plugin instance settings taken before rendering.
+        plugin_settings (dict): Copy of the settings the image was rendered with, including values the plugin
+            stored in them, which `PlaylistRefresh.complete()` applies to the plugin instance once the image is used.
+    """
+
+    def __init__(self, playlist_name, plugin_instance, slot_dt, lead_seconds):
+        self.playlist_name = playlist_name
+        self.plugin_id = plugin_instance.plugin_id
+        self.instance_name = plugin_instance.name
+        self.slot_dt = slot_dt
+        self.lead_seconds = lead_seconds
+        self.future = None
+        self.settings = None
+        self.plugin_settings = None
+
+    def matches(self, playlist, plugin_instance):
+        """Checks whether this image was rendered for the given plugin instance."""
+        return (self.playlist_name == playlist.name and self.plugin_id == plugin_instance.plugin_id
+                and self.instance_name == plugin_instance.name)
+
+    def is_current(self, current_dt):
+        """Checks whether a refresh at current_dt is the slot this image was rendered for."""
+        return abs((current_dt - self.slot_dt).total_seconds()) <= self.lead_seconds
+
+    def get_image(self, plugin_instance):
+        """Returns the prerendered image, waiting for it if it's still rendering, or None if it can't be used.
+
+        A prerender that hasn't started yet is cancelled rather than waited for, and the image is discarded if the
+        settings were edited since it was rendered. The prerender pool enforces the plugin's timeout.
+        """
+        if self.future.cancel():
+            logger.info(f"Prerender hasn't started, rendering now. | plugin_instance: {plugin_instance.name}")
+            return None
+        try:
+            image = self.future.result()
+        except FutureTimeoutError:
+            logger.warning(f"Prerender did not finish in time, discarding. | plugin_instance: {plugin_instance.name}")
+            return None
+        except Exception as e:
+            logger.warning(f"Prerender failed, rendering again. | plugin_instance: {plugin_instance.name} | error: {e}")
+            return None
+
+        # discard the image if the settings were edited since the render started
+        if image is None or self.settings != PrerenderedImage.snapshot_settings(plugin_instance.settings):
+            logger.info(f"Settings changed since prerendering, rendering again. | plugin_instance: {plugin_instance.name}")
+            return None
+
+        logger.info(f"Using prerendered image. | plugin_instance: {plugin_instance.name}")
+        return image
+
+    @staticmethod
+    def snapshot_settings(settings):
+        """Serializes plugin settings so later edits can be detected."""
+        return json.dumps(settings, sort_keys=True, default=str)
+
+class RefreshRender:
+    """An image generated for a refresh on the worker pool, waiting to be displayed by the refresh thread.
+
+    Attributes:
+        render_id (int): Increasing id, a render is not displayed over one dispatched after it.
+        refresh_action (RefreshAction): The refresh the image was generated for.
+        current_dt (datetime): Time of the refresh.
+        job (RefreshJob): The manual update job, or None for a playlist refresh.
+        image (PIL.Image): The generated image.
+        image_settings (list): Image settings of the plugin.
+        frame (PIL.Image): The image as processed for the display.
+        image_hash (str): Hash of the frame quantized to the display palette.
+        error (Exception): Exception raised while generating the image.
+    """
+
+    def __init__(self, render_id, refresh_action, current_dt, job=None):
+        self.render_id = render_id
+        self.refresh_action = refresh_action
+        self.current_dt = current_dt
+        self.job = job
+        self.image = None
+        self.image_settings = None
+        self.frame = None
+        self.image_hash = None
+        self.error = None
+
+class BusyPlugins:
+    """Plugin ids with a job running on one of the PluginWorkerPools sharing this set.
+
+    Plugin objects are shared instances, so the pools never run two jobs of the same plugin at the same time. A
+    plugin stays busy until the thread of its job exits, even if the job was abandoned after its timeout. The
+    pools share the lock of this set, so a pool can start the jobs of the other pools once a plugin is free.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.plugin_ids = set()
+        self.pools = []
+
+class PluginWorkerPool:
+    """Runs plugin image generation on a bounded number of threads.
+
+    Unlike a ThreadPoolExecutor, the timeout of a job starts once it gets a worker rather than when it's queued.
+    A job running past its timeout is abandoned: its future fails with a TimeoutError and its thread no longer
+    counts against the pool, so hung plugins can't starve later jobs. Python threads can't be interrupted, the
+    abandoned thread exits whenever the plugin returns and its result is dropped.
+
+    Jobs submitted with a plugin id wait in the queue while that plugin is busy in any pool sharing the same
+    BusyPlugins, later jobs for other plugins are started ahead of them.
+
+    Attributes:
+        max_workers (int): Number of jobs run at the same time.
+        name (str): Prefix of the worker thread names.
+        busy_plugins (BusyPlugins): Plugins with a running job, shared with the other pools.
+    """
+
+    def __init__(self, max_workers, name, busy_plugins=None):
+        self.max_workers = max_workers
+        self.name = name
+        self.busy_plugins = busy_plugins or BusyPlugins()
+        self.busy_plugins.pools.append(self)
+        self.lock = self.busy_plugins.lock
+        self.pending = deque()
+        self.active = 0
+        self.shut_down = False
+        self.thread_ids = itertools.count(1)
+
+    def submit(self, fn, *args, plugin_id=None, timeout=None):
+        """Queues fn(*args) and returns a Future for its result.
+
+        Raises:
+            RuntimeError: If the pool has been shut down.
+        """
+        future = Future()
+        with self.lock:
+            if self.shut_down:
+                raise RuntimeError(f"Worker pool '{self.name}' has been shut down.")
+            self.pending.append((future, fn, args, plugin_id, timeout))
+            self._start_pending()
+        return future
+
+    def shutdown(self):
+        """Stops accepting jobs and cancels the queued ones, running jobs are left to finish."""
+        with self.lock:
+            self.shut_down = True
+            pending = list(self.pending)
+            self.pending.clear()
+        for future, _, _, _, _ in pending:
+            future.cancel()
+
+    def _start_pending(self):
+        # called with the lock held
+        for job in list(self.pending):
+            if self.active >= self.max_workers:
+                break
+            future, fn, args, plugin_id, timeout = job
+            if plugin_id in self.busy_plugins.plugin_ids and not future.cancelled():
+                continue
+            self.pending.remove(job)
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            worker = PluginWorker(future, plugin_id, timeout)
+            if timeout:
+                worker.timer = threading.Timer(timeout, self._expire, args=(worker,))
+                worker.timer.daemon = True
+            if plugin_id is not None:
+                self.busy_plugins.plugin_ids.add(plugin_id)
+            self.active += 1
+
+            thread = threading.Thread(target=self._work, args=(worker, fn, args),
+                                      name=f"{self.name}-{next(self.thread_ids)}", daemon=True)
+            thread.start()
+            if worker.timer:
+                worker.timer.start()
+
+    def _work(self, worker, fn, args):
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            if self._release(worker):
+                worker.future.set_exception(e)
+        else:
+            if self._release(worker):
+                worker.future.set_result(result)
+            else:
+                logger.info(f"Abandoned plugin job finished, discarding its result. | pool: {self.name}")
+        finally:
+            if worker.plugin_id is not None:
+                self._release_plugin(worker.plugin_id)
+
+    def _expire(self, worker):
+        if self._release(worker):
+            logger.warning(f"Plugin job timed out, abandoning its thread. | pool: {self.name} | timeout: {worker.timeout}")
+            worker.future.set_exception(FutureTimeoutError(f"Job did not finish within {worker.timeout} seconds."))
+
+    def _release(self, worker):
+        """Frees the worker's slot and starts the next queued job, returns False if it was already freed."""
+        with self.lock:
+            if worker.released:
+                return False
+            worker.released = True
+            if worker.timer:
+                worker.timer.cancel()
+            self.active -= 1
+            self._start_pending()
+        return True
+
+    def _release_plugin(self, plugin_id):
+        """Marks the plugin as free once the thread of its job exits and starts the jobs that waited for it."""
+        with self.lock:
+            self.busy_plugins.plugin_ids.discard(plugin_id)
+            for pool in self.busy_plugins.pools:
+                pool._start_pending()
+
+class PluginWorker:
+    """A job running on a PluginWorkerPool."""
+
+    def __init__(self, future, plugin_id, timeout):
+        self.future = future
+        self.plugin_id = plugin_id
+        self.timeout = timeout
+        self.timer = None
+        self.released = False
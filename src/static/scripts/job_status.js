@@ -0,0 +1,25 @@
+// Polls a queued update job until it finishes and returns its final status
+async function waitForJob(jobUrl, pollInterval = 1000) {
+    while (true) {
+        const response = await fetch(jobUrl);
+        if (response.status === 404) {
+            throw new Error('The update is no longer tracked, check the display for its result.');
+        }
+        const job = await response.json().catch(() => ({}));
+        if (!response.ok) {
+            throw new Error(job.error || `Failed to get the update status (HTTP ${response.status}).`);
+        }
+        if (job.status === 'done' || job.status === 'error') {
+            return job;
+        }
+        await new Promise(resolve => setTimeout(resolve, pollInterval));
+    }
+}
+
+// Builds the message shown once a queued update job has finished
+function jobResultMessage(job) {
+    if (job.status === 'error') {
+        return `Error!  ${job.error}`;
+    }
+    return 'Success! Display updated';
+}
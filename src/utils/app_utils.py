@@ -32,6 +32,19 @@ FONT_FAMILIES = {
     }]
 }
 
+# Javascript libraries used by plugin render templates, bundled in static/vendor so renders don't
+# depend on the network
+VENDOR_SCRIPTS = {
+    "fullcalendar": {
+        "name": "FullCalendar",
+        "file": os.path.join("fullcalendar", "index.global.min.js")
+    },
+    "chartjs": {
+        "name": "Chart.js",
+        "file": os.path.join("chartjs", "chart.umd.min.js")
+    }
+}
+
 FONTS = {
     "ds-gigi": "DS-DIGI.TTF",
     "napoli": "Napoli.ttf",
@@ -96,6 +109,28 @@ def get_fonts():
             })
     return fonts_list
 
+def get_vendor_scripts():
+    """Returns a dict of library name to the local path of its script.
+
+    Looking up a library that is missing from static/vendor raises a RuntimeError, so a template using it fails
+    instead of rendering without it.
+    """
+    scripts = VendorScripts()
+    for name, script in VENDOR_SCRIPTS.items():
+        path = resolve_path(os.path.join("static", "vendor", script["file"]))
+        if os.path.isfile(path):
+            scripts[name] = path
+    return scripts
+
+class VendorScripts(dict):
+    """Library name to script path, raising a RuntimeError for a library missing from the checkout."""
+
+    def __missing__(self, name):
+        script = VENDOR_SCRIPTS.get(name)
+        if script is None:
+            raise KeyError(name)
+        raise RuntimeError(f"{script['name']} is missing from static/vendor/{os.path.dirname(script['file'])}, restore it from the repository.")
+
 def get_font_path(font_name):
     return resolve_path(os.path.join("static", "fonts", FONTS[font_name]))
 
@@ -0,0 +1,304 @@
+import atexit
+import base64
+import fcntl
+import json
+import logging
+import os
+import select
+import subprocess
+import sys
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+import psutil
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+BROWSER_COMMAND = [
+    "chromium-headless-shell",
+    "--headless",
+    "--remote-debugging-pipe",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--disable-software-rasterizer",
+    "--disable-background-networking",
+    "--disable-dev-shm-usage",
+    "--hide-scrollbars",
+    "--single-process",
+    "--disable-extensions",
+    "--disable-plugins",
+    "--mute-audio",
+    "--js-flags=--max_old_space_size=128"
+]
+
+# The browser talks DevTools protocol over fds 3 (commands in) and 4 (responses out)
+BROWSER_READ_FD = 3
+BROWSER_WRITE_FD = 4
+
+# runs in the child process before the browser, takes the read and write pipe fds and the fds to move them to,
+# followed by the browser command. Isolated mode without site packages keeps the interpreter startup short.
+REMAP_FDS_WRAPPER = """
+import os, sys
+args = sys.argv[1:]
+src_read, dst_read, src_write, dst_write = map(int, args[:4])
+os.dup2(src_read, dst_read)
+os.dup2(src_write, dst_write)
+os.close(src_read)
+os.close(src_write)
+os.execvp(args[4], args[4:])
+"""
+
+# inkypi.service caps the whole service at MemoryMax=200M, restart the browser well
+# before it pushes the service into the OOM killer.
+MAX_BROWSER_MEMORY_MB = 120
+DEFAULT_TIMEOUT_MS = 30000
+
+# url patterns blocked when rendering without network access
+BLOCKED_URL_PATTERNS = ["http://*", "https://*", "ws://*", "wss://*"]
+STARTUP_TIMEOUT_MS = 15000
+# time left for the screenshot of a page that didn't finish loading before its timeout
+CAPTURE_TIMEOUT_MS = 10000
+
+class HeadlessBrowser:
+    """Keeps a single headless Chromium process warm and renders pages through the DevTools protocol.
+
+    Cold starting Chromium dominates the refresh time on a Pi Zero, so the browser is started once and
+    reused for every screenshot. It is restarted automatically if the process dies, a render fails or
+    its memory usage grows past `max_memory_mb`.
+    """
+
+    def __init__(self, command=BROWSER_COMMAND, max_memory_mb=MAX_BROWSER_MEMORY_MB):
+        self.command = command
+        self.max_memory_mb = max_memory_mb
+
+        self.lock = threading.Lock()
+        self.process = None
+        self.read_fd = None
+        self.write_fd = None
+        self.buffer = b""
+        self.events = []
+        self.message_id = 0
+
+    def screenshot(self, url, dimensions, timeout_ms=None, block_network=False):
+        """Loads the url in a fresh tab and returns a PIL image of the rendered viewport.
+
+        If block_network is set, http(s) requests made by the page are blocked.
+        """
+        with self.lock:
+            for attempt in range(2):
+                try:
+                    self._ensure_started()
+                    png_bytes = self._capture(url, dimensions, timeout_ms or DEFAULT_TIMEOUT_MS, block_network)
+                    self._check_memory()
+                    with Image.open(BytesIO(png_bytes)) as img:
+                        return img.copy()
+                except Exception as e:
+                    crashed = self.process is None or self.process.poll() is not None
+                    logger.warning(f"Headless browser render failed, restarting browser. | crashed: {crashed} | error: {e}")
+                    self._stop()
+                    # only retry when the browser died underneath us, a slow page will be slow again
+                    if not crashed or attempt > 0:
+                        raise
+            return None
+
+    def stop(self):
+        """Terminates the browser process."""
+        with self.lock:
+            self._stop()
+
+    def _ensure_started(self):
+        if self.process and self.process.poll() is None:
+            return
+
+        self._stop()
+        logger.info("Starting headless browser")
+
+        # move the pipe ends above the fds the browser expects so the redirections can't clobber them
+        child_read, parent_write = os.pipe()
+        parent_read, child_write = os.pipe()
+        child_read_fd = fcntl.fcntl(child_read, fcntl.F_DUPFD, 10)
+        child_write_fd = fcntl.fcntl(child_write, fcntl.F_DUPFD, 10)
+        os.close(child_read)
+        os.close(child_write)
+
+        # preexec_fn isn't safe in a multithreaded process, a small wrapper moves the pipe ends onto the fds the
+        # browser expects and execs it, so the browser keeps the wrapper's pid
+        wrapper = [sys.executable, "-I", "-S", "-c", REMAP_FDS_WRAPPER, str(child_read_fd), str(BROWSER_READ_FD),
+                   str(child_write_fd), str(BROWSER_WRITE_FD)]
+
+        try:
+            self.process = subprocess.Popen(
+                wrapper + list(self.command),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                pass_fds=(child_read_fd, child_write_fd)
+            )
+        except Exception:
+            os.close(parent_read)
+            os.close(parent_write)
+            raise
+        finally:
+            os.close(child_read_fd)
+            os.close(child_write_fd)
+
+        self.read_fd = parent_read
+        self.write_fd = parent_write
+        self.buffer = b""
+        self.events = []
+
+        # the browser answers once its DevTools handler is up
+        self._send("Browser.getVersion", timeout_ms=STARTUP_TIMEOUT_MS)
+
+    def _stop(self):
+        if self.process:
+            if self.process.poll() is None:
+                logger.info("Stopping headless browser")
+                self.process.terminate()
+                try:
+                    self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait()
+            self.process = None
+
+        for fd in (self.read_fd, self.write_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.read_fd = None
+        self.write_fd = None
+        self.buffer = b""
+        self.events = []
+
+    def _capture(self, url, dimensions, timeout_ms, block_network=False):
+        deadline = time.monotonic() + timeout_ms / 1000
+        width, height = int(dimensions[0]), int(dimensions[1])
+
+        target_id = self._send("Target.createTarget", {"url": "about:blank"}, deadline=deadline)["targetId"]
+        try:
+            session_id = self._send("Target.attachToTarget", {"targetId": target_id, "flatten": True}, deadline=deadline)["sessionId"]
+
+            self._send("Emulation.setDeviceMetricsOverride", {
+                "width": width,
+                "height": height,
+                "deviceScaleFactor": 1,
+                "mobile": False
+            }, session_id=session_id, deadline=deadline)
+            if block_network:
+                self._send("Network.enable", session_id=session_id, deadline=deadline)
+                self._send("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS}, session_id=session_id, deadline=deadline)
+            self._send("Page.enable", session_id=session_id, deadline=deadline)
+            self.events = []
+            try:
+                self._send("Page.navigate", {"url": url}, session_id=session_id, deadline=deadline)
+                self._wait_for_event("Page.loadEventFired", session_id, deadline)
+
+                # web fonts may still be loading after the load event
+                self._send("Runtime.evaluate", {
+                    "expression": "document.fonts.ready.then(() => true)",
+                    "awaitPromise": True
+                }, session_id=session_id, deadline=deadline)
+            except TimeoutError:
+                # like chromium's --timeout, capture whatever has loaded, pages with long polling or slow
+                # trackers may never fire the load event
+                logger.warning(f"Page did not finish loading within {timeout_ms} ms, capturing it as it is. | url: {url}")
+                deadline = time.monotonic() + CAPTURE_TIMEOUT_MS / 1000
+
+            result = self._send("Page.captureScreenshot", {
+                "format": "png",
+                "clip": {"x": 0, "y": 0, "width": width, "height": height, "scale": 1}
+            }, session_id=session_id, deadline=deadline)
+            return base64.b64decode(result["data"])
+        finally:
+            if self.process and self.process.poll() is None:
+                # don't let a failure to close the tab hide the capture error
+                try:
+                    self._send("Target.closeTarget", {"targetId": target_id}, timeout_ms=STARTUP_TIMEOUT_MS)
+                except Exception as e:
+                    logger.warning(f"Failed to close headless browser tab. | target_id: {target_id} | error: {e}")
+
+    def _check_memory(self):
+        try:
+            process = psutil.Process(self.process.pid)
+            rss = process.memory_info().rss
+            for child in process.children(recursive=True):
+                rss += child.memory_info().rss
+        except psutil.Error:
+            return
+
+        rss_mb = rss / (1024 * 1024)
+        if rss_mb > self.max_memory_mb:
+            logger.info(f"Headless browser memory above limit, restarting. | rss_mb: {rss_mb:.0f} | max_memory_mb: {self.max_memory_mb}")
+            self._stop()
+
+    def _send(self, method, params=None, session_id=None, deadline=None, timeout_ms=DEFAULT_TIMEOUT_MS):
+        if deadline is None:
+            deadline = time.monotonic() + timeout_ms / 1000
+
+        self.message_id += 1
+        message_id = self.message_id
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+
+        data = json.dumps(message).encode("utf-8") + b"\0"
+        while data:
+            written = os.write(self.write_fd, data)
+            data = data[written:]
+
+        while True:
+            response = self._read_message(deadline)
+            if response.get("id") == message_id:
+                if "error" in response:
+                    raise RuntimeError(f"DevTools command {method} failed: {response['error'].get('message')}")
+                return response.get("result", {})
+            if "method" in response:
+                self.events.append(response)
+
+    def _wait_for_event(self, method, session_id, deadline):
+        while True:
+            for event in self.events:
+                if event.get("method") == method and event.get("sessionId") == session_id:
+                    self.events.remove(event)
+                    return event
+            self.events.append(self._read_message(deadline))
+
+    def _read_message(self, deadline):
+        while b"\0" not in self.buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("Timed out waiting for headless browser")
+            readable, _, _ = select.select([self.read_fd], [], [], remaining)
+            if not readable:
+                continue
+            chunk = os.read(self.read_fd, 65536)
+            if not chunk:
+                raise ConnectionError("Headless browser closed the DevTools pipe")
+            self.buffer += chunk
+
+        message, self.buffer = self.buffer.split(b"\0", 1)
+        return json.loads(message)
+
+_browser = None
+_browser_lock = threading.Lock()
+
+def get_browser():
+    """Returns the shared headless browser, created on first use."""
+    global _browser
+    with _browser_lock:
+        if _browser is None:
+            _browser = HeadlessBrowser()
+            atexit.register(_browser.stop)
+        return _browser
+
+def to_url(target):
+    """Converts a local file path into a file:// url, leaving urls untouched."""
+    if os.path.exists(target):
+        return Path(target).resolve().as_uri()
+    return target
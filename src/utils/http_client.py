@@ -0,0 +1,210 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from utils.app_utils import resolve_path
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_DIR = resolve_path(os.path.join("cache", "http"))
+MAX_HTTP_CACHE_BYTES = 20 * 1024 * 1024
+
+# (connect, read) timeout in seconds applied when a caller doesn't pass one
+DEFAULT_TIMEOUT = (10, 30)
+DEFAULT_RETRIES = 3
+DEFAULT_POOL_SIZE = 10
+# longest wait between retries, including waits asked for with a Retry-After header, so retrying a request
+# stays well within the plugin timeout
+MAX_RETRY_WAIT_SECONDS = 5
+
+USER_AGENT = "InkyPi/0.0 (https://github.com/fatihak/InkyPi/)"
+
+class CappedRetry(Retry):
+    """Retry that honors Retry-After headers but never waits longer than MAX_RETRY_WAIT_SECONDS."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, MAX_RETRY_WAIT_SECONDS)
+
+class HttpClient:
+    """Shared HTTP client for plugins with pooled keep-alive connections, default timeouts and retries.
+
+    GET requests made with `conditional=True` store the response body along with its ETag/Last-Modified
+    validators on disk. Later requests for the same url send them back, and a 304 Not Modified answer is
+    served from the stored body, so unchanged feeds cost a round trip instead of a full download. Entries
+    are keyed on the url and the headers passed by the caller, so requests asking for a different
+    representation (e.g. another Accept or Authorization header) don't share a cached body.
+
+    Attributes:
+        session (requests.Session): Session shared by all requests, connections are reused across plugins.
+        timeout (tuple): Default (connect, read) timeout in seconds.
+        cache_dir (str): Directory the conditional request cache is stored in.
+        max_cache_bytes (int): Total size the cache is trimmed to, least recently used entries are removed first.
+    """
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 pool_size=DEFAULT_POOL_SIZE, max_cache_bytes=MAX_HTTP_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.max_cache_bytes = max_cache_bytes
+        self.lock = threading.Lock()
+
+        retry = CappedRetry(
+            total=retries,
+            backoff_factor=0.5,
+            backoff_max=MAX_RETRY_WAIT_SECONDS,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "HEAD"]),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url, params=None, headers=None, conditional=False, **kwargs):
+        """Sends a GET request, accepts the same keyword arguments as `requests.get`.
+
+        If `conditional` is set the response is revalidated against the on-disk cache and a 304 answer is
+        returned as the cached 200 response. Responses carry a `from_cache` flag telling whether the body
+        came from the cache.
+        """
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        if not conditional:
+            response = self.session.get(url, params=params, headers=headers, **kwargs)
+            response.from_cache = False
+            return response
+
+        request = requests.Request("GET", url, params=params)
+        cache_key = self._get_cache_key(request.prepare().url, headers)
+        meta = self._read_meta(cache_key)
+
+        headers = dict(headers or {})
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = self.session.get(url, params=params, headers=headers, **kwargs)
+        response.from_cache = False
+        response.cache_key = cache_key
+
+        if response.status_code == 304 and meta:
+            content = self._read_body(cache_key)
+            if content is not None:
+                logger.debug(f"HTTP cache revalidated. | url: {meta.get('url')}")
+                response.status_code = 200
+                response._content = content
+                response.encoding = meta.get("encoding")
+                if meta.get("content_type"):
+                    response.headers["Content-Type"] = meta["content_type"]
+                response.from_cache = True
+                return response
+
+        if not kwargs.get("stream"):
+            self.cache_response(response, response.content)
+        return response
+
+    def cache_response(self, response, content):
+        """Stores the body of a 200 response to a conditional request, if the server sent validators for it.
+
+        Called by `get`, except for streamed responses whose body is only known once the caller has read it.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or getattr(response, "from_cache", False) or not (etag or last_modified):
+            return
+
+        cache_key = getattr(response, "cache_key", None)
+        if cache_key is None:
+            # key on the url that was requested, before any redirects
+            request_url = response.history[0].request.url if response.history else response.request.url
+            cache_key = self._get_cache_key(request_url)
+        self._write(cache_key, content, {
+            "url": response.url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": response.headers.get("Content-Type"),
+            "encoding": response.encoding
+        })
+
+    def _read_meta(self, cache_key):
+        meta_path = self._get_path(cache_key, "json")
+        if not os.path.isfile(meta_path):
+            return None
+        try:
+            with open(meta_path) as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to read HTTP cache entry {meta_path}: {e}")
+            return None
+
+    def _read_body(self, cache_key):
+        body_path = self._get_path(cache_key, "body")
+        try:
+            with open(body_path, "rb") as f:
+                content = f.read()
+            # bump the modification time to mark the entry as recently used
+            os.utime(body_path)
+            return content
+        except OSError as e:
+            logger.warning(f"Failed to read HTTP cache entry {body_path}: {e}")
+            return None
+
+    def _write(self, cache_key, content, meta):
+        with self.lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                for ext, data, mode in (("body", content, "wb"), ("json", json.dumps(meta), "w")):
+                    path = self._get_path(cache_key, ext)
+                    tmp_path = f"{path}.tmp"
+                    with open(tmp_path, mode) as f:
+                        f.write(data)
+                    os.replace(tmp_path, path)
+                self._evict()
+            except Exception as e:
+                logger.warning(f"Failed to write HTTP cache entry for {meta.get('url')}: {e}")
+
+    def _evict(self):
+        entries = []
+        total_bytes = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".body"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_bytes += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= self.max_cache_bytes:
+                break
+            for cache_path in (path, path[:-len("body")] + "json"):
+                if os.path.exists(cache_path):
+                    os.remove(cache_path)
+            total_bytes -= size
+            logger.debug(f"Evicted HTTP cache entry {path}")
+
+    @staticmethod
+    def _get_cache_key(url, headers=None):
+        # header names are case insensitive, the validators added by `get` are never part of the key
+        key_headers = sorted((name.lower(), str(value)) for name, value in (headers or {}).items()
+                             if name.lower() not in ("if-none-match", "if-modified-since"))
+        key = json.dumps([url, key_headers]) if key_headers else url
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _get_path(self, cache_key, ext):
+        return os.path.join(self.cache_dir, f"{cache_key}.{ext}")
+
+http_client = HttpClient()
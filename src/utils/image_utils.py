@@ -1,22 +1,155 @@
-import requests
-from PIL import Image, ImageEnhance
+from PIL import Image, ImageEnhance, ImageFile, ImageOps, ImageStat
 from io import BytesIO
 import os
 import logging
+import requests
 import hashlib
 import tempfile
 import subprocess
+from utils.headless_browser import get_browser, to_url
+from utils.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
-def get_image(image_url):
-    response = requests.get(image_url)
-    img = None
-    if 200 <= response.status_code < 300 or response.status_code == 304:
-        img = Image.open(BytesIO(response.content))
-    else:
-        logger.error(f"Received non-200 response from {image_url}: status_code: {response.status_code}")
-    return img
+# Colors of a 7-color ACeP e-ink panel, used when a display doesn't provide its own palette
+DEFAULT_PALETTE = [
+    (0, 0, 0),
+    (255, 255, 255),
+    (0, 255, 0),
+    (0, 0, 255),
+    (255, 0, 0),
+    (255, 255, 0),
+    (255, 140, 0)
+]
+
+# EXIF orientations that rotate the image by 90 degrees, swapping its width and height
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+# Largest image download accepted, keeps a single image from exhausting the service's memory
+MAX_IMAGE_DOWNLOAD_BYTES = 30 * 1024 * 1024
+
+# (connect, read) timeout in seconds for image downloads
+IMAGE_DOWNLOAD_TIMEOUT = (10, 30)
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+
+def get_image(image_url, target_size=None):
+    try:
+        return download_image(image_url, target_size, conditional=True)
+    except requests.HTTPError as e:
+        logger.error(f"Received non-200 response from {image_url}: status_code: {e.response.status_code}")
+        return None
+    except (requests.RequestException, ValueError) as e:
+        # timeouts, connection errors and images over the size limit
+        logger.error(f"Failed to download image from {image_url}: {e}")
+        return None
+
+def download_image(url, target_size=None, max_bytes=MAX_IMAGE_DOWNLOAD_BYTES, timeout=IMAGE_DOWNLOAD_TIMEOUT,
+                   conditional=False, **kwargs):
+    """Downloads and decodes an image while streaming it, without holding the whole response in memory first.
+
+    Most formats are fed chunk by chunk into an incremental `ImageFile.Parser`, so decoding overlaps the
+    transfer. JPEG images that are larger than needed for target_size are collected instead and decoded at
+    a reduced scale with `load_image`, which uses less memory than a full size decode. Conditional requests
+    are also collected, so the body can be stored for revalidation.
+
+    Args:
+        url (str): Image url.
+        target_size (tuple, optional): (width, height) the image will be displayed at, see `load_image`.
+        max_bytes (int): Downloads larger than this are aborted.
+        timeout (tuple or float): (connect, read) timeout in seconds.
+        conditional (bool): Revalidate against the HTTP cache, see `HttpClient.get`.
+        **kwargs: Passed to `HttpClient.get`, e.g. params or headers.
+
+    Returns:
+        PIL.Image: The loaded, upright image.
+
+    Raises:
+        requests.HTTPError: If the server responds with an error status.
+        ValueError: If the image is larger than max_bytes.
+    """
+    with http_client.get(url, conditional=conditional, stream=True, timeout=timeout, **kwargs) as response:
+        response.raise_for_status()
+        if response.from_cache:
+            return load_image(BytesIO(response.content), target_size)
+
+        content_length = response.headers.get("Content-Length")
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            raise ValueError(f"Image at {url} is {content_length} bytes, over the {max_bytes} byte limit.")
+
+        chunks = response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE)
+        first_chunk = next(chunks, b"")
+        size = len(first_chunk)
+
+        if conditional or (target_size and first_chunk.startswith(JPEG_SIGNATURE)):
+            data = bytearray(first_chunk)
+            for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"Image at {url} exceeds the {max_bytes} byte limit.")
+                data += chunk
+
+            if conditional:
+                http_client.cache_response(response, bytes(data))
+            return load_image(BytesIO(data), target_size)
+
+        parser = ImageFile.Parser()
+        parser.feed(first_chunk)
+        for chunk in chunks:
+            size += len(chunk)
+            if size > max_bytes:
+                raise ValueError(f"Image at {url} exceeds the {max_bytes} byte limit.")
+            parser.feed(chunk)
+        image = parser.close()
+
+    return reduce_image(image, target_size)
+
+def load_image(source, target_size=None):
+    """Opens an image from a path or file object, decoding it no larger than needed for target_size.
+
+    The image is only reduced while it still covers target_size in both dimensions, so it can be
+    cropped and resized to the target afterwards without losing detail. JPEG images are decoded at
+    a reduced scale with `draft()`, other formats are decoded in full and then shrunk by an integer
+    factor with `reduce()`. The EXIF orientation is applied and accounted for when reducing.
+
+    Args:
+        source (str or file object): Image file path or file object.
+        target_size (tuple, optional): (width, height) the image will be displayed at, the image is
+            decoded at full resolution if not given.
+
+    Returns:
+        PIL.Image: The loaded, upright image.
+    """
+    with Image.open(source) as img:
+        original_size = img.size
+        if target_size and img.format == "JPEG":
+            img.draft(None, get_stored_size(img, target_size))
+        image = reduce_image(img, target_size)
+
+    if image.width * image.height < original_size[0] * original_size[1]:
+        logger.debug(f"Reduced image while decoding. | original_size: {original_size} | size: {image.size}")
+    return image
+
+def reduce_image(img, target_size=None):
+    """Loads the image, shrinks it by the largest integer factor that still covers target_size and applies
+    its EXIF orientation. Returns a new, upright image."""
+    if target_size:
+        target_width, target_height = get_stored_size(img, target_size)
+        img.load()
+        factor = min(img.width // target_width, img.height // target_height)
+        if factor >= 2:
+            img = img.reduce(factor)
+
+    return ImageOps.exif_transpose(img)
+
+def get_stored_size(img, size):
+    """Returns size in the orientation the image is stored in, images are reduced before they're turned upright."""
+    width, height = int(size[0]), int(size[1])
+    if img.getexif().get(0x0112, 1) in TRANSPOSED_ORIENTATIONS:
+        return height, width
+    return width, height
 
 def change_orientation(image, orientation, inverted=False):
     if orientation == 'horizontal':
@@ -76,13 +209,122 @@ def apply_image_enhancement(img, image_settings={}):
 
     return img
 
-def compute_image_hash(image):
-    """Compute SHA-256 hash of an image."""
-    image = image.convert("RGB")
-    img_bytes = image.tobytes()
-    return hashlib.sha256(img_bytes).hexdigest()
+# Transposes equivalent to rotating an image counterclockwise by the given angle with expand
+ROTATION_TRANSPOSES = {
+    90: Image.Transpose.ROTATE_90,
+    180: Image.Transpose.ROTATE_180,
+    270: Image.Transpose.ROTATE_270
+}
 
-def take_screenshot_html(html_str, dimensions, timeout_ms=None):
+# Weights of the RGB channels in the grayscale image ImageEnhance uses for contrast and saturation
+LUMA_WEIGHTS = (0.299, 0.587, 0.114)
+
+def process_frame(image, desired_size, orientation="horizontal", inverted=False, image_settings=[], enhancement_settings={}):
+    """Turns a plugin image into the frame sent to the display in as few passes as possible.
+
+    Produces the same frame as `change_orientation`, `resize_image`, rotating by 180 degrees if
+    inverted and `apply_image_enhancement` applied one after the other, with fewer intermediate
+    images: the crop is mapped back onto the source so only the cropped region is rotated, rotations
+    are transposes, and brightness, contrast and saturation are combined into one color matrix.
+    Steps that wouldn't change the image are skipped. The geometry matches the separate steps
+    pixel for pixel.
+
+    Brightness, contrast and saturation are clipped once at the end rather than after each step,
+    so results differ slightly from `apply_image_enhancement` where an earlier step saturates.
+    """
+    angle = 90 if orientation == "vertical" else 0
+    width, height = image.size
+    desired_width, desired_height = int(desired_size[0]), int(desired_size[1])
+
+    # crop box in the oriented image, as computed by resize_image
+    oriented_width, oriented_height = (height, width) if angle == 90 else (width, height)
+    crop_width, crop_height = oriented_width, oriented_height
+    x_offset, y_offset = 0, 0
+    keep_width = "keep-width" in image_settings
+    desired_ratio = desired_width / desired_height
+    if oriented_width / oriented_height > desired_ratio:
+        crop_width = int(oriented_height * desired_ratio)
+        if not keep_width:
+            x_offset = (oriented_width - crop_width) // 2
+    else:
+        crop_height = int(oriented_width / desired_ratio)
+        if not keep_width:
+            y_offset = (oriented_height - crop_height) // 2
+    left, upper, right, lower = x_offset, y_offset, x_offset + crop_width, y_offset + crop_height
+
+    # map the crop box back onto the source, so only the cropped region is rotated
+    if angle == 90:
+        box = (width - lower, left, width - upper, right)
+    else:
+        box = (left, upper, right, lower)
+
+    # crop and rotate before resizing, resampling with a box would pull in pixels from outside it and
+    # resampling before the rotation runs the separable filter passes in the other order
+    if box != (0, 0, width, height):
+        image = image.crop(box)
+    if angle:
+        image = image.transpose(ROTATION_TRANSPOSES[angle])
+    if image.size != (desired_width, desired_height):
+        image = image.resize((desired_width, desired_height), Image.LANCZOS)
+    if inverted:
+        image = image.transpose(ROTATION_TRANSPOSES[180])
+
+    matrix = get_enhancement_matrix(image, enhancement_settings or {})
+    if matrix:
+        image = image.convert("RGB").convert("RGB", matrix)
+
+    sharpness = (enhancement_settings or {}).get("sharpness", 1.0)
+    if sharpness != 1.0:
+        image = ImageEnhance.Sharpness(image).enhance(sharpness)
+
+    return image
+
+def get_enhancement_matrix(image, image_settings={}):
+    """Combines the brightness, contrast and saturation of the image settings into a single
+    RGB conversion matrix for `Image.convert`, or returns None if they're all 1.0.
+
+    Brightness scales the colors, contrast moves them away from the mean gray level and
+    saturation away from each pixel's gray level, as ImageEnhance does.
+    """
+    brightness = image_settings.get("brightness", 1.0)
+    contrast = image_settings.get("contrast", 1.0)
+    saturation = image_settings.get("saturation", 1.0)
+    if brightness == 1.0 and contrast == 1.0 and saturation == 1.0:
+        return None
+
+    # the mean gray level after brightness, rounded like ImageEnhance.Contrast
+    mean = 0
+    if contrast != 1.0:
+        mean = int(ImageStat.Stat(image.convert("L")).mean[0] * brightness + 0.5)
+
+    scale = brightness * contrast
+    offset = (1 - contrast) * mean
+    matrix = []
+    for channel in range(3):
+        for source in range(3):
+            weight = (1 - saturation) * LUMA_WEIGHTS[source]
+            if source == channel:
+                weight += saturation
+            matrix.append(scale * weight)
+        matrix.append(offset)
+    return tuple(matrix)
+
+def compute_image_hash(image, palette=DEFAULT_PALETTE):
+    """Compute SHA-256 hash of an image after quantizing it to the display palette.
+
+    The image should already be at display resolution, so differences the panel can't
+    show (e.g. subtle color shifts between renders) don't produce a different hash.
+    """
+    palette_image = Image.new("P", (1, 1))
+    flat_palette = [channel for color in palette for channel in color]
+    # pad with the first color so unused palette entries can't be matched
+    flat_palette += list(palette[0]) * (256 - len(palette))
+    palette_image.putpalette(flat_palette)
+
+    image = image.convert("RGB").quantize(palette=palette_image, dither=Image.Dither.NONE)
+    return hashlib.sha256(image.tobytes()).hexdigest()
+
+def take_screenshot_html(html_str, dimensions, timeout_ms=None, block_network=False):
     image = None
     try:
         # Create a temporary HTML file
@@ -90,7 +332,7 @@ def take_screenshot_html(html_str, dimensions, timeout_ms=None):
             html_file.write(html_str.encode("utf-8"))
             html_file_path = html_file.name
 
-        image = take_screenshot(html_file_path, dimensions, timeout_ms)
+        image = take_screenshot(html_file_path, dimensions, timeout_ms, block_network)
 
         # Remove html file
         os.remove(html_file_path)
@@ -100,7 +342,21 @@ def take_screenshot_html(html_str, dimensions, timeout_ms=None):
 
     return image
 
-def take_screenshot(target, dimensions, timeout_ms=None):
+def take_screenshot(target, dimensions, timeout_ms=None, block_network=False):
+    """Renders the target with the persistent headless browser, falling back to a one-off browser process.
+
+    A page still loading after timeout_ms is captured as it is. If block_network is set, only local files can be
+    loaded by the page.
+    """
+    try:
+        return get_browser().screenshot(to_url(target), dimensions, timeout_ms, block_network)
+    except Exception as e:
+        logger.warning(f"Persistent browser unavailable, falling back to one-off screenshot: {str(e)}")
+
+    return take_screenshot_oneshot(target, dimensions, timeout_ms, block_network)
+
+def take_screenshot_oneshot(target, dimensions, timeout_ms=None, block_network=False):
+    """Starts a new chromium-headless-shell process to screenshot the target."""
     image = None
     try:
         # Create a temporary output file for the screenshot
@@ -127,6 +383,9 @@ def take_screenshot(target, dimensions, timeout_ms=None):
         ]
         if timeout_ms:
             command.append(f"--timeout={timeout_ms}")
+        if block_network:
+            # fail every hostname lookup, local files are unaffected
+            command.append("--host-resolver-rules=MAP * ~NOTFOUND")
         result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
         # Check if the process failed or the output file is missing
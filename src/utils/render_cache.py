@@ -0,0 +1,101 @@
+import hashlib
+import logging
+import os
+import threading
+from PIL import Image
+from utils.app_utils import resolve_path
+
+logger = logging.getLogger(__name__)
+
+RENDER_CACHE_DIR = resolve_path(os.path.join("static", "images", "plugins", "render_cache"))
+MAX_RENDER_CACHE_BYTES = 20 * 1024 * 1024
+
+class RenderCache:
+    """Disk-backed LRU cache of rendered plugin images, keyed by a hash of everything that affects the render.
+
+    Attributes:
+        cache_dir (str): Directory the cached PNG files are stored in.
+        max_bytes (int): Total size the cache is trimmed to, least recently used entries are removed first.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that required a render.
+    """
+
+    def __init__(self, cache_dir=RENDER_CACHE_DIR, max_bytes=MAX_RENDER_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def compute_key(*parts):
+        """Computes a SHA-256 cache key from strings, bytes or other values."""
+        digest = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, str):
+                part = part.encode("utf-8")
+            elif not isinstance(part, bytes):
+                part = repr(part).encode("utf-8")
+            # length prefix so adjacent parts can't run into each other
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Returns the cached image for the key or None, updating the hit/miss counters."""
+        path = self._get_path(key)
+        with self.lock:
+            image = None
+            if os.path.isfile(path):
+                try:
+                    with Image.open(path) as img:
+                        image = img.copy()
+                    # bump the modification time to mark the entry as recently used
+                    os.utime(path)
+                except Exception as e:
+                    logger.warning(f"Failed to read render cache entry {path}: {e}")
+                    image = None
+
+            if image:
+                self.hits += 1
+                logger.info(f"Render cache hit. | key: {key[:12]} | hits: {self.hits} | misses: {self.misses}")
+            else:
+                self.misses += 1
+                logger.info(f"Render cache miss. | key: {key[:12]} | hits: {self.hits} | misses: {self.misses}")
+            return image
+
+    def put(self, key, image):
+        """Stores the image under the key and trims the cache to its size limit."""
+        path = self._get_path(key)
+        with self.lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                image.save(tmp_path, format="PNG")
+                os.replace(tmp_path, path)
+                self._evict()
+            except Exception as e:
+                logger.warning(f"Failed to write render cache entry {path}: {e}")
+
+    def _evict(self):
+        entries = []
+        total_bytes = 0
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(".png"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total_bytes += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            os.remove(path)
+            total_bytes -= size
+            logger.debug(f"Evicted render cache entry {path}")
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+render_cache = RenderCache()